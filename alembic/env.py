@@ -1,9 +1,5 @@
 import asyncio
 from logging.config import fileConfig
-from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
-
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
 
 from alembic import context
 
@@ -20,13 +16,29 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-from app.config import settings
-from app.models import quiz,user
+from app.models import job,quiz,user
+from sqlalchemy import MetaData
+from sqlalchemy.engine import make_url
 from sqlmodel import SQLModel
-from app.db import create_async_engine
+from app.db import create_async_engine, database_url
 target_metadata = SQLModel.metadata
 #target_metadata = None
 
+# PostgreSQL's default FK names. SQLite only knows the names spelled out in the
+# DDL, so on SQLite the tables created by migrations get them explicitly and
+# revisions that drop FKs by name run on both backends.
+PG_FK_NAMES = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def migration_metadata(dialect_name: str) -> MetaData:
+    """target_metadata, on SQLite copied under PG_FK_NAMES (op.create_table uses its convention)."""
+    if dialect_name != "sqlite":
+        return target_metadata
+    metadata = MetaData(naming_convention={**target_metadata.naming_convention, **PG_FK_NAMES})
+    for table in target_metadata.sorted_tables:
+        table.to_metadata(metadata)
+    return metadata
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -45,10 +57,10 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
+    url = config.get_main_option("sqlalchemy.url") or database_url()[0]
     context.configure(
         url=url,
-        target_metadata=target_metadata,
+        target_metadata=migration_metadata(make_url(url).get_backend_name()),
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -62,7 +74,7 @@ def do_run_migrations(connection):
     """Run migrations in 'online' mode using a live connection."""
     context.configure(
         connection=connection,
-        target_metadata=target_metadata,
+        target_metadata=migration_metadata(connection.dialect.name),
         compare_type=True,      # detect column type changes
         render_as_batch=True    # useful for SQLite, harmless elsewhere
     )
@@ -73,51 +85,19 @@ def do_run_migrations(connection):
 # Async online migration function
 
 async def run_migrations_online() -> None:
-    """Run migrations in 'online' mode with asyncpg."""
-
-    db_url_str = str(settings.DATABASE_URL)
-    connect_args = {}
-
-    # Parse DB URL and adjust for asyncpg
-    parsed_url = urlparse(db_url_str)
-    scheme = parsed_url.scheme
-    if scheme == "postgresql":
-        scheme = "postgresql+asyncpg"
-
-    current_query_params = parse_qs(parsed_url.query)
-    new_query_params = {}
-
-    for key, value in current_query_params.items():
-        if key.lower() == "sslmode" and value[0] == "require":
-            connect_args["ssl"] = True
-        else:
-            new_query_params[key] = value[0]
-
-    cleaned_query_string = urlencode(new_query_params)
-    final_url_str = urlunparse((
-        scheme,
-        parsed_url.netloc,
-        parsed_url.path,
-        parsed_url.params,
-        cleaned_query_string,
-        parsed_url.fragment,
-    ))
-
-    connectable = create_async_engine(final_url_str, connect_args=connect_args)
-
-    async with connectable.connect() as connection:
-        await connection.run_sync(do_run_migrations)
-
-    await connectable.dispose()
-
-
-if context.is_offline_mode():
-    run_migrations_offline()
-else:
-    asyncio.run(run_migrations_online())
-
-    
-
+    """Run migrations in 'online' mode on the app's async driver (asyncpg or aiosqlite)."""
+
+    # Same URL handling as the app: postgresql:// / sqlite:// get the async
+    # driver, sslmode becomes asyncpg's ssl argument
+    url, connect_args = database_url()
+    connectable = create_async_engine(url, connect_args=connect_args)
+
+    try:
+        async with connectable.connect() as connection:
+            await connection.run_sync(do_run_migrations)
+    finally:
+        # aiosqlite's worker thread keeps the process alive until disposed
+        await connectable.dispose()
 
 
 if context.is_offline_mode():
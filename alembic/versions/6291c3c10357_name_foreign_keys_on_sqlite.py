@@ -0,0 +1,47 @@
+"""Give SQLite foreign keys PostgreSQL's default names
+
+Revision ID: 6291c3c10357
+Revises: cb539de76d01
+Create Date: 2026-10-19 16:40:12.318904
+
+Revisions that drop FKs do it by PostgreSQL's default name
+(<table>_<column>_fkey). SQLite only knows names spelled out in the DDL:
+alembic/env.py now spells them out for tables created by migrations, and this
+revision rebuilds the SQLite tables that still have unnamed FKs (e.g. created
+with create_all, then stamped) under the same names. No-op on PostgreSQL,
+which has named them that way all along.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6291c3c10357'
+down_revision: Union[str, Sequence[str], None] = 'cb539de76d01'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PG_FK_NAMES = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    inspector = sa.inspect(bind)
+    for table in inspector.get_table_names():
+        if all(fk["name"] for fk in inspector.get_foreign_keys(table)):
+            continue
+        # Batch mode names the reflected unnamed FKs by the convention while
+        # it copies the table
+        with op.batch_alter_table(table, recreate="always", naming_convention=PG_FK_NAMES):
+            pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The names are harmless on older revisions: nothing to undo
+    pass
@@ -0,0 +1,62 @@
+"""Store refresh tokens as sha256 hashes with indexes on hash and expiry
+
+Revision ID: b7e3f1a0c2d4
+Revises: 9c41d2e7a5b3
+Create Date: 2026-10-19 11:40:02.514863
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f1a0c2d4'
+down_revision: Union[str, Sequence[str], None] = '9c41d2e7a5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('refreshtoken', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+
+    # Hash the raw tokens already stored so existing sessions stay valid
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("UPDATE refreshtoken SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')")
+    else:
+        rows = bind.execute(sa.text("SELECT id, token FROM refreshtoken")).all()
+        for row_id, token in rows:
+            bind.execute(
+                sa.text("UPDATE refreshtoken SET token_hash = :h WHERE id = :id"),
+                {"h": hashlib.sha256(token.encode()).hexdigest(), "id": row_id},
+            )
+    # Duplicate rows of the same token would break the unique index; keep the newest
+    op.execute(
+        "DELETE FROM refreshtoken WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM refreshtoken GROUP BY token_hash) AS keep)"
+    )
+
+    with op.batch_alter_table('refreshtoken', schema=None) as batch_op:
+        batch_op.alter_column('token_hash',
+               existing_type=sqlmodel.sql.sqltypes.AutoString(length=64),
+               nullable=False)
+        batch_op.drop_column('token')
+        batch_op.create_index(batch_op.f('ix_refreshtoken_token_hash'), ['token_hash'], unique=True)
+        batch_op.create_index(batch_op.f('ix_refreshtoken_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Raw tokens cannot be recovered from their hashes: every user has to log in again
+    op.execute("DELETE FROM refreshtoken")
+    with op.batch_alter_table('refreshtoken', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refreshtoken_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_refreshtoken_token_hash'))
+        batch_op.add_column(sa.Column('token', sa.VARCHAR(), nullable=False))
+        batch_op.drop_column('token_hash')
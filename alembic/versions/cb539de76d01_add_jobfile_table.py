@@ -0,0 +1,48 @@
+"""Add jobfile table for job uploads and results
+
+Revision ID: cb539de76d01
+Revises: f3c7a2e9b104
+Create Date: 2026-10-19 06:53:40.505169
+
+Job uploads and export results move from the local JOBS_DIR into the
+database, so any worker process or host can run a claimed job.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cb539de76d01'
+down_revision: Union[str, Sequence[str], None] = 'f3c7a2e9b104'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobfile',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('filename', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('media_type', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['job.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('jobfile', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_jobfile_job_id'), ['job_id'], unique=False)
+
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobfile', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobfile_job_id'))
+
+    op.drop_table('jobfile')
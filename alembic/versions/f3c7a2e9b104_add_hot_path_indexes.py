@@ -0,0 +1,55 @@
+"""Add indexes for hot query paths (attempts, answers, questions, options, results, tokens, username)
+
+Revision ID: f3c7a2e9b104
+Revises: e5f0b8d1a7c2
+Create Date: 2026-10-19 15:02:11.846025
+
+Indexes are built with CREATE INDEX CONCURRENTLY on PostgreSQL, outside the
+migration transaction, so live tables stay writable. A failed concurrent
+build leaves an INVALID index behind: drop it and re-run the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c7a2e9b104'
+down_revision: Union[str, Sequence[str], None] = 'e5f0b8d1a7c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, extra kwargs)
+INDEXES = [
+    ('ix_quizattempt_user_quiz_submitted', 'quizattempt', ['user_id', 'quiz_id', 'submitted_at'], {}),
+    ('ix_quizattempt_open_deadline', 'quizattempt', ['deadline'], {
+        'postgresql_where': sa.text('submitted_at IS NULL'),
+        'sqlite_where': sa.text('submitted_at IS NULL'),
+    }),
+    ('ix_quizanswer_attempt_id', 'quizanswer', ['attempt_id'], {}),
+    ('ix_question_quiz_id', 'question', ['quiz_id'], {}),
+    ('ix_option_question_id', 'option', ['question_id'], {}),
+    ('ix_quizresult_graded_at', 'quizresult', ['graded_at'], {}),
+    ('ix_refreshtoken_user_id', 'refreshtoken', ['user_id'], {}),
+    ('ix_user_username', 'user', ['username'], {}),
+]
+
+
+def _concurrently() -> dict:
+    return {'postgresql_concurrently': True} if op.get_context().dialect.name == 'postgresql' else {}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, **kwargs, **_concurrently())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, **_concurrently())
@@ -0,0 +1,162 @@
+"""
+Admission control for bursty, expensive endpoints (exam start).
+
+When an exam opens, every student calls get-or-create-attempt within seconds.
+Rather than letting all of them race for the connection pool (and time out
+together), an AdmissionGate lets a bounded number run at once per worker and
+queues the rest in arrival order. A caller that would wait longer than
+max_wait, or finds the queue full, gets 503 with a jittered Retry-After, so
+retries spread out instead of arriving as a second wave.
+"""
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from fastapi import HTTPException, status
+from app.config import settings
+from app.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds", "Time spent queued for an admission slot, by gate and outcome", ("gate", "outcome"),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class AdmissionGate:
+    """
+    At most `concurrency` holders; up to `max_queue` waiters served FIFO (a
+    released slot is handed straight to the oldest waiter, so late arrivals
+    cannot overtake the queue).
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._running = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._hold_seconds = 0.0  # moving average, for the Retry-After estimate
+        self.stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "max_waiting": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+    def _retry_after(self) -> int:
+        """Seconds until the queue has likely drained, at least ADMISSION_RETRY_AFTER, plus jitter."""
+        drain = (len(self._waiters) + 1) * self._hold_seconds / self.concurrency
+        base = max(settings.ADMISSION_RETRY_AFTER, drain)
+        return math.ceil(base * (1 + random.random() * settings.ADMISSION_RETRY_JITTER))
+
+    def _reject(self, reason: str):
+        self.stats[f"rejected_{reason}"] += 1
+        retry_after = self._retry_after()
+        logger.info(
+            "Admission rejected", extra={"gate": self.name, "reason": reason, "waiting": len(self._waiters),
+                                         "retry_after": retry_after, "sampled": True},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def acquire(self):
+        if self._running < self.concurrency and not self._waiters:
+            self._running += 1
+            self.stats["admitted"] += 1
+            ADMISSION_WAIT.observe(0.0, gate=self.name, outcome="admitted")
+            return
+        if len(self._waiters) >= self.max_queue:
+            ADMISSION_WAIT.observe(0.0, gate=self.name, outcome="rejected")
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        self.stats["max_waiting"] = max(self.stats["max_waiting"], len(self._waiters))
+        queued_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.max_wait):
+                await waiter
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            waited = time.perf_counter() - queued_at
+            self.stats["wait_seconds_total"] += waited
+            if isinstance(exc, TimeoutError):
+                ADMISSION_WAIT.observe(waited, gate=self.name, outcome="rejected")
+                self._reject("timeout")
+            raise
+        waited = time.perf_counter() - queued_at
+        self.stats["admitted"] += 1
+        self.stats["wait_seconds_total"] += waited
+        ADMISSION_WAIT.observe(waited, gate=self.name, outcome="admitted")
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # slot changes hands; _running unchanged
+                return
+        self._running -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._hold_seconds += (time.perf_counter() - started - self._hold_seconds) * 0.1
+            self.release()
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "running": self._running,
+            "waiting": len(self._waiters),
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+            "avg_hold_seconds": round(self._hold_seconds, 4),
+        }
+
+
+attempt_start_gate = AdmissionGate(
+    "attempt_start",
+    settings.ADMISSION_ATTEMPT_CONCURRENCY,
+    settings.ADMISSION_ATTEMPT_QUEUE,
+    settings.ADMISSION_ATTEMPT_MAX_WAIT,
+)
+GATES = (attempt_start_gate,)
+
+
+@asynccontextmanager
+async def admitted(gate: AdmissionGate):
+    """`async with admitted(gate):` -- a no-op when ADMISSION_CONTROL is off."""
+    if not settings.ADMISSION_CONTROL:
+        yield
+        return
+    async with gate.slot():
+        yield
+
+
+def admission_stats() -> dict:
+    return {gate.name: gate.snapshot() for gate in GATES} | {"enabled": settings.ADMISSION_CONTROL}
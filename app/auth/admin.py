@@ -1,23 +1,27 @@
 
+import logging
 from sqlmodel import select
-from app.auth.deps import get_current_user
-from app.auth.utils import get_password_hash
+from app.auth.deps import get_current_principal, get_current_user
+from app.auth.role_registry import get_role, load_roles, role_name
+from app.auth.utils import get_password_hash_async
 from app.db import AsyncSessionLocal
-from app.models.user import Role, User
+from app.models.user import Principal, Role, User
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 
 async def create_admin():
     async with AsyncSessionLocal() as session:
         # Ensure admin role exists
-        result = await session.exec(select(Role).where(Role.name == "admin"))
-        admin_role = result.first()
+        admin_role = get_role("admin")
         if not admin_role:
             admin_role = Role(name="admin", description="Administrator role")
             session.add(admin_role)
             await session.commit()
             await session.refresh(admin_role)
+            await load_roles()
 
         # Ensure admin user exists
         result = await session.exec(select(User).where(User.username == "admin"))
@@ -26,16 +30,16 @@ async def create_admin():
             new_admin = User(
                 username="admin",
                 email="admin@gmail.com",
-                password_hash=get_password_hash("admin123"),
+                password_hash=await get_password_hash_async("admin123"),
                 role_id=admin_role.id,
             )
             session.add(new_admin)
             await session.commit()
-            print("Admin user created ✅")
+            logger.info("Admin user created")
 
 
 
-def admin_required(user: User = Depends(get_current_user)):
+def admin_required(user: Principal = Depends(get_current_principal)):
     if user.role.name != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -43,10 +47,19 @@ def admin_required(user: User = Depends(get_current_user)):
         )
     return user
 
-def user_required(user: User = Depends(get_current_user)):
+def user_required(user: Principal = Depends(get_current_principal)):
     if user.role.name not in ["student", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not allowed!"
         )
     return user
+
+async def profile_required(user: User = Depends(get_current_user)):
+    """Like user_required, but loads the full User row (for /user/me and profile edits)."""
+    if await role_name(user.role_id) not in ["student", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed!"
+        )
+    return user
@@ -1,16 +1,22 @@
-from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from datetime import datetime, timedelta
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import Depends,HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
 from jose import JWTError,jwt
-from app.auth.utils import verify_password
-from app.models.user import TokenData,User
+from app.auth.utils import get_password_hash_async, password_needs_rehash, verify_password_async
+from app.auth.principal_cache import cache_principal, get_cached_principal
+from app.auth.revocation import is_access_token_revoked
+from app.auth.role_registry import get_role_by_id
+from app.models.user import Principal, PrincipalRole, Role, TokenData, User
 from app.db import get_session
 from fastapi import Depends, HTTPException
+import logging
 import os
+import uuid
+
+logger = logging.getLogger(__name__)
 SECRET_KEY = os.getenv("SECRET_KEY","fallback_secret")
 
 ALGORITHM = "HS256"
@@ -18,37 +24,39 @@ ALGORITHM = "HS256"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 async def authenticate_user(session:AsyncSession, username: str, password: str):
-    result = await session.exec(select(User).where(User.username == username).options(selectinload(User.role))  # eager load the role
-)
+    result = await session.exec(select(User).where(User.username == username))  # role comes from the registry
     user = result.first()
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return False
+    if password_needs_rehash(user.password_hash):
+        # Stored with a lower cost (bulk provisioning); the caller's commit saves the upgrade
+        user.password_hash = await get_password_hash_async(password)
+        session.add(user)
     return user
 
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=15)):
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
+    # jti lets a single access token be revoked (see app.auth.revocation)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def create_refresh_token(data: dict, expires_delta: timedelta = timedelta(hours=2)):
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
+    # jti keeps two tokens issued in the same second distinct (their hashes are unique)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 
 
-async def get_current_user(
-    session: Annotated[AsyncSession, Depends(get_session)],
-    # token: Annotated[str, Depends(oauth2_scheme)]
-    request: Request,
-):
+def _decode_access_token(request: Request) -> tuple[str, str, Optional[str]]:
+    """Read the access-token cookie and return (username, role, token id)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -61,7 +69,7 @@ async def get_current_user(
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         role: str = payload.get("role")
-        print("Decoded payload:", payload)
+        logger.debug("Access token decoded", extra={"sub": username, "role": role, "sampled": True})
         if username is None or role is None:
             raise credentials_exception
 
@@ -70,26 +78,80 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    result = await session.exec(
-        select(User)
-        .where(User.username == token_data.username)
-        .options(selectinload(User.role))   # eager load role here too
-    )
+    return token_data.username, token_data.role, payload.get("jti")
+
+
+def access_token_claims(request: Request) -> Optional[dict]:
+    """Claims of the access-token cookie, or None if it is missing or invalid."""
+    token = request.cookies.get("access_token")
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+
+async def _reject_revoked(session: AsyncSession, token_id: Optional[str]):
+    if await is_access_token_revoked(session, token_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def get_current_user(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    # token: Annotated[str, Depends(oauth2_scheme)]
+    request: Request,
+):
+    """Full User row for routes that read or modify the profile itself."""
+    username, _, token_id = _decode_access_token(request)
+    await _reject_revoked(session, token_id)
+
+    result = await session.exec(select(User).where(User.username == username))
     user = result.one_or_none()
-   # print("Fetched user:", user)
-    # print("Fetched role:", user.role.name if user and user.role else None)
-    # print("Issuing access token for:", user.username, "role:", user.role.name)
 
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-    return user  # return the actual User model (with role info)
+    return user  # return the actual User model (role name via app.auth.role_registry)
 
-     
-    
 
+async def get_current_principal(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    request: Request,
+) -> Principal:
+    """
+    Id + role of the caller. Served from the in-process principal cache, so
+    authorization usually needs no database round trip (revocation is checked
+    against an in-memory filter first).
+    """
+    username, _, token_id = _decode_access_token(request)
+    await _reject_revoked(session, token_id)
+
+    principal = get_cached_principal(username, token_id)
+    if principal is not None:
+        return principal
 
-    
-        
-    
-    
\ No newline at end of file
+    result = await session.exec(
+        select(User.id, User.username, User.role_id).where(User.username == username)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user_id, username, role_id = row
+    role = await get_role_by_id(role_id) or PrincipalRole(id=role_id, name="unknown")
+    principal = Principal(id=user_id, username=username, role=role)
+    cache_principal(username, token_id, principal)
+    return principal
@@ -1,7 +1,7 @@
 # from typing import Annotated
 import json
 from typing import Annotated
-from fastapi import APIRouter, Body, Cookie, Depends, Form, HTTPException, Response, status
+from fastapi import APIRouter, Body, Cookie, Depends, Form, HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from sqlalchemy import update
@@ -9,11 +9,15 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
-from sqlalchemy.orm import selectinload
 from app.db import get_session
 from app.models.user import LogoutRequest, User, RefreshToken, Token, TokenData
-from app.auth.utils import verify_password
-from app.auth.deps import ALGORITHM, SECRET_KEY, authenticate_user, create_access_token, create_refresh_token, get_current_user
+from app.auth.utils import hash_refresh_token, password_hash_stats, verify_password
+from app.auth.admin import admin_required
+from app.auth.principal_cache import invalidate_principal
+from app.auth.rate_limit import login_rate_limit, rate_limit_stats
+from app.auth.revocation import revocation_stats, revoke_access_token
+from app.auth.role_registry import role_name
+from app.auth.deps import ALGORITHM, SECRET_KEY, access_token_claims, authenticate_user, create_access_token, create_refresh_token, get_current_user
 
 # ---------------------
 # Constants
@@ -34,39 +38,40 @@ def now_utc_naive() -> datetime:
 
 
 # ---------------------
-# Validate & slide refresh token
+# Validate refresh token
 # ---------------------
-async def is_valid_refresh_token(session: AsyncSession, username: str, token: str) -> bool:
+async def get_valid_refresh_token(session: AsyncSession, token: str) -> tuple[RefreshToken, User] | None:
+    """
+    Look the token up by hash together with its user (one query; the role
+    name comes from the role registry).
+    Returns (token, user) if the token is still usable.
+    """
     result = await session.exec(
-        select(RefreshToken).join(User).where(User.username == username, RefreshToken.token == token)
+        select(RefreshToken, User)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
     )
-    db_token = result.first()
-    if not db_token:
-        return False
+    row = result.first()
+    if not row:
+        return None
 
+    db_token, user = row
     # Compare UTC
-    if db_token.expires_at < now_utc_naive():
-        return False
-
-    # Sliding expiration: extend token expiry
-    db_token.expires_at = now_utc_naive() + timedelta(hours=SLIDING_EXPIRATION_HOURS)
-    session.add(db_token)
-    await session.commit()
-    return True
+    if db_token.revoked or db_token.expires_at < now_utc_naive():
+        return None
+    return db_token, user
 
 # ---------------------
-# Save refresh token
+# Add refresh token (caller commits)
 # ---------------------
-async def save_refresh_token(session: AsyncSession, user_id: int, token: str):
+def add_refresh_token(session: AsyncSession, user_id: int, token: str):
     expires_at = now_utc_naive() + timedelta(hours=SLIDING_EXPIRATION_HOURS)
-    db_token = RefreshToken(user_id=user_id, token=token, expires_at=expires_at)
-    session.add(db_token)
-    await session.commit()
+    session.add(RefreshToken(user_id=user_id, token_hash=hash_refresh_token(token), expires_at=expires_at))
 
 # ---------------------
 # Login & issue tokens (updated)
 # ---------------------
-@auth_router.post("/token")
+@auth_router.post("/token", dependencies=[Depends(login_rate_limit)])
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Annotated[AsyncSession, Depends(get_session)]
@@ -76,30 +81,29 @@ async def login_for_access_token(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
 
     # Create access token
+    role = await role_name(user.role_id)
     access_token = create_access_token(
-        data={"sub": user.username, "role": user.role.name},
+        data={"sub": user.username, "role": role},
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
 
-    # 🔹 CHANGED: Revoke all old refresh tokens on login
+    # 🔹 CHANGED: Revoke all old refresh tokens and store the new one in one transaction
+    refresh_token = create_refresh_token(data={"sub": user.username})
     await session.execute(
         update(RefreshToken)
-        .where(RefreshToken.user_id == user.id)
+        .where(RefreshToken.user_id == user.id, RefreshToken.revoked.is_(False))
         .values(revoked=True)
     )
+    add_refresh_token(session, user.id, refresh_token)
     await session.commit()
 
-    # 🔹 CHANGED: Always create a new refresh token
-    refresh_token = create_refresh_token(data={"sub": user.username})
-    await save_refresh_token(session, user.id, refresh_token)
-
     # return JSON with tokens
     response = JSONResponse(content={
         "success": True,
         "access_token": access_token,
         "refresh_token": refresh_token,
         "userId": user.id,
-        "role": user.role.name
+        "role": role
     })
 
     # Set HttpOnly cookies (refresh and access) 🔹 CHANGED
@@ -140,33 +144,31 @@ async def refresh_token_endpoint(
         if not username:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-        # 🔹 CHANGED: Validate old token
-        valid = await is_valid_refresh_token(session, username, refresh_token)
+        # 🔹 CHANGED: Validate old token (user comes with it)
+        valid = await get_valid_refresh_token(session, refresh_token)
         if not valid:
             raise HTTPException(status_code=401, detail="Expired or revoked refresh token")
-
-        result = await session.exec(select(User).where(User.username == username).options(selectinload(User.role)))
-        user = result.first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        db_token, user = valid
 
         # Create new access token
         access_token = create_access_token(
-            data={"sub": username, "role": user.role.name},
+            data={"sub": user.username, "role": await role_name(user.role_id)},
             expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         )
 
-        # 🔹 CHANGED: Rotate refresh token
-        new_refresh_token = create_refresh_token(data={"sub": username})
-        # Revoke old token
-        await session.execute(
+        # 🔹 CHANGED: Rotate refresh token in one transaction. The old token is revoked
+        # rather than slid; the revoked=False guard makes a concurrent reuse lose.
+        new_refresh_token = create_refresh_token(data={"sub": user.username})
+        revoked = await session.execute(
             update(RefreshToken)
-            .where(RefreshToken.token == refresh_token)
+            .where(RefreshToken.id == db_token.id, RefreshToken.revoked.is_(False))
             .values(revoked=True)
         )
+        if revoked.rowcount != 1:
+            await session.rollback()
+            raise HTTPException(status_code=401, detail="Expired or revoked refresh token")
+        add_refresh_token(session, user.id, new_refresh_token)
         await session.commit()
-        # Save new token
-        await save_refresh_token(session, user.id, new_refresh_token)
 
         # 🔹 CHANGED: Return and set new cookies
         response = JSONResponse(content={
@@ -199,21 +201,30 @@ async def refresh_token_endpoint(
 
 
 
+async def _revoke_current_access_token(session: AsyncSession, http_request: Request, user_id: int):
+    claims = access_token_claims(http_request)
+    if claims and claims.get("jti") and claims.get("exp"):
+        await revoke_access_token(session, claims["jti"], datetime.utcfromtimestamp(claims["exp"]), user_id)
+
+
 @auth_router.post("/logout")
 async def logout(
     response: Response,
     session: Annotated[AsyncSession, Depends(get_session)],
+    http_request: Request,
     request: LogoutRequest | None = None,
     user: Annotated[User | None, Depends(get_current_user)] = None,
 ):
     if user:
-        # Revoke all refresh tokens for this user
+        # Revoke all refresh tokens for this user, and the access token itself
         await session.execute(
             update(RefreshToken)
             .where(RefreshToken.user_id == user.id)
             .values(revoked=True)
         )
+        await _revoke_current_access_token(session, http_request, user.id)
         await session.commit()
+        invalidate_principal(user.id)
 
         response.delete_cookie(
         key="access_token",
@@ -229,13 +240,15 @@ async def logout(
 
     elif request and request.refresh_token:
         result = await session.exec(
-            select(RefreshToken).where(RefreshToken.token == request.refresh_token)
+            select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(request.refresh_token))
         )
         db_token = result.first()
         if db_token:
             db_token.revoked = True
             session.add(db_token)
+            await _revoke_current_access_token(session, http_request, db_token.user_id)
             await session.commit()
+            invalidate_principal(db_token.user_id)
 
         response.delete_cookie(
         key="access_token",
@@ -252,3 +265,21 @@ async def logout(
         return {"msg": "Logged out with refresh token"}
 
     raise HTTPException(status_code=401, detail="No valid token for logout")
+
+
+@auth_router.get("/revocation-stats")
+async def get_revocation_stats(admin: Annotated[User, Depends(admin_required)]):
+    """Size and hit counts of the revoked access-token filter (admin only)."""
+    return revocation_stats()
+
+
+@auth_router.get("/rate-limit-stats")
+async def get_rate_limit_stats(admin: Annotated[User, Depends(admin_required)]):
+    """Allowed / throttled counts of the login and signup limiters (admin only)."""
+    return rate_limit_stats()
+
+
+@auth_router.get("/password-hash-stats")
+async def get_password_hash_stats(admin: Annotated[User, Depends(admin_required)]):
+    """Queue depth / timing of the bcrypt thread pool (admin only)."""
+    return password_hash_stats()
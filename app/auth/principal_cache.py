@@ -0,0 +1,79 @@
+import time
+from typing import Optional
+from app.config import settings
+from app.invalidation import on_full_flush, publish, subscribe
+from app.models.user import Principal
+
+# (token subject, token id) -> (expires_at, principal)
+_cache: dict[tuple[str, Optional[str]], tuple[float, Principal]] = {}
+_keys_by_user: dict[int, set[tuple[str, Optional[str]]]] = {}
+
+
+def get_cached_principal(subject: str, token_id: Optional[str] = None) -> Optional[Principal]:
+    key = (subject, token_id)
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, principal = entry
+    if expires_at < time.monotonic():
+        _drop(key)
+        return None
+    return principal
+
+
+def cache_principal(subject: str, token_id: Optional[str], principal: Principal):
+    if settings.PRINCIPAL_CACHE_TTL <= 0:
+        return
+    key = (subject, token_id)
+    if key not in _cache and len(_cache) >= settings.PRINCIPAL_CACHE_SIZE:
+        _drop(next(iter(_cache)))  # evict the oldest entry
+    _cache[key] = (time.monotonic() + settings.PRINCIPAL_CACHE_TTL, principal)
+    _keys_by_user.setdefault(principal.id, set()).add(key)
+
+
+def _drop(key: tuple[str, Optional[str]]):
+    entry = _cache.pop(key, None)
+    if entry is None:
+        return
+    keys = _keys_by_user.get(entry[1].id)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del _keys_by_user[entry[1].id]
+
+
+def _evict_user(user_id: int):
+    for key in list(_keys_by_user.get(user_id, ())):
+        _drop(key)
+
+
+def _clear():
+    _cache.clear()
+    _keys_by_user.clear()
+
+
+def invalidate_principal(user_id: int):
+    """Forget every cached token of a user (profile/role change, delete, logout), on every worker."""
+    _evict_user(user_id)
+    publish("principal", user_id)
+
+
+def clear_principal_cache():
+    """Forget everything (e.g. a role was renamed or deleted), on every worker."""
+    _clear()
+    publish("principal")
+
+
+def _on_principal_event(user_id: Optional[int]):
+    if user_id is None:
+        _clear()
+    else:
+        _evict_user(int(user_id))
+
+
+subscribe("principal", _on_principal_event)
+on_full_flush(_clear)
+
+
+def principal_cache_stats() -> dict:
+    return {"size": len(_cache), "users": len(_keys_by_user), "ttl_seconds": settings.PRINCIPAL_CACHE_TTL}
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Annotated
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import delete, text
+from app.config import settings
+from app.db import AsyncSessionLocal, engine
+from app.models.user import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+# Atomic token-bucket step on the shared table (same syntax on PostgreSQL and SQLite)
+_SHARED_TAKE = text("""
+    INSERT INTO ratelimitbucket (key, tokens, updated_at, allowed)
+    VALUES (:key, :capacity - 1, :now, true)
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = CASE
+            WHEN ratelimitbucket.tokens + (:now - ratelimitbucket.updated_at) * :rate >= :capacity THEN :capacity - 1
+            WHEN ratelimitbucket.tokens + (:now - ratelimitbucket.updated_at) * :rate >= 1
+                THEN ratelimitbucket.tokens + (:now - ratelimitbucket.updated_at) * :rate - 1
+            ELSE ratelimitbucket.tokens + (:now - ratelimitbucket.updated_at) * :rate
+        END,
+        allowed = ratelimitbucket.tokens + (:now - ratelimitbucket.updated_at) * :rate >= 1,
+        updated_at = :now
+    RETURNING tokens, allowed
+""")
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets: `capacity` attempts in a burst, refilled at
+    `per_minute`. Buckets live in an LRU-bounded dict; with RATE_LIMIT_SHARED
+    an admitted attempt is also charged to a bucket in the database, so the
+    limit holds across workers.
+    """
+
+    def __init__(self, name: str, capacity: int, per_minute: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.stats = {"allowed": 0, "throttled": 0}
+
+    def _take_local(self, key: str) -> float:
+        """Spend one token; returns 0 if allowed, else seconds until a token is free."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > settings.RATE_LIMIT_MAX_KEYS:
+            self._buckets.popitem(last=False)  # least recently seen key
+        return wait
+
+    async def _take_shared(self, key: str) -> float:
+        async with engine.begin() as conn:
+            result = await conn.execute(_SHARED_TAKE, {
+                "key": f"{self.name}:{key}",
+                "capacity": float(self.capacity),
+                "rate": self.rate,
+                "now": time.time(),
+            })
+            tokens, allowed = result.one()
+        return 0.0 if allowed else (1 - tokens) / self.rate
+
+    async def take(self, key: str) -> float:
+        wait = self._take_local(key)
+        if not wait and settings.RATE_LIMIT_SHARED:
+            try:
+                wait = await self._take_shared(key)
+            except Exception:
+                # The limiter must not take logins down with it: fall back to the local bucket
+                logger.exception("Shared rate limit check failed (%s)", self.name)
+        self.stats["throttled" if wait else "allowed"] += 1
+        return wait
+
+
+login_ip_limiter = TokenBucketLimiter("login_ip", settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE)
+login_username_limiter = TokenBucketLimiter(
+    "login_username", settings.LOGIN_USERNAME_BURST, settings.LOGIN_USERNAME_PER_MINUTE
+)
+signup_ip_limiter = TokenBucketLimiter("signup_ip", settings.SIGNUP_IP_BURST, settings.SIGNUP_IP_PER_MINUTE)
+LIMITERS = (login_ip_limiter, login_username_limiter, signup_ip_limiter)
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _enforce(checks: list[tuple[TokenBucketLimiter, str]]):
+    for limiter, key in checks:
+        wait = await limiter.take(key)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+
+async def login_rate_limit(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+):
+    """Runs before the login handler: no bcrypt or DB work for throttled attempts."""
+    await _enforce([
+        (login_ip_limiter, client_ip(request)),
+        (login_username_limiter, form_data.username.strip().lower()),
+    ])
+
+
+async def signup_rate_limit(request: Request):
+    await _enforce([(signup_ip_limiter, client_ip(request))])
+
+
+async def purge_rate_limit_buckets():
+    """Drop shared buckets idle long enough to be full again."""
+    idle = max(l.capacity / l.rate for l in LIMITERS)
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(RateLimitBucket).where(RateLimitBucket.updated_at < time.time() - idle))
+        await session.commit()
+
+
+async def rate_limit_purge_loop():
+    """Background task started from lifespan when RATE_LIMIT_SHARED is on."""
+    while True:
+        await asyncio.sleep(settings.RATE_LIMIT_PURGE_INTERVAL)
+        try:
+            await purge_rate_limit_buckets()
+        except Exception:
+            logger.exception("Rate limit bucket purge failed")
+
+
+def rate_limit_stats() -> dict:
+    return {
+        l.name: {
+            **l.stats,
+            "tracked_keys": len(l._buckets),
+            "burst": l.capacity,
+            "per_minute": l.rate * 60,
+        }
+        for l in LIMITERS
+    } | {"shared": settings.RATE_LIMIT_SHARED}
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.db import AsyncSessionLocal, insert_ignore
+from app.invalidation import on_full_flush, publish, subscribe
+from app.models.user import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Rows revoked by other workers are read with this much overlap, so clock skew
+# between workers or late commits are still picked up by the incremental sync.
+SYNC_OVERLAP = timedelta(seconds=10)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+_filter = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+_synced_at: Optional[datetime] = None
+_rebuilt_at = 0.0
+_stats = {"checks": 0, "filter_hits": 0, "confirmed": 0, "syncs": 0, "rebuilds": 0}
+
+
+async def rebuild_revocation_filter():
+    """Load every unexpired revoked jti into a fresh filter and purge expired rows."""
+    global _filter, _synced_at, _rebuilt_at
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+        await session.commit()
+        result = await session.exec(select(RevokedToken.jti).where(RevokedToken.expires_at >= now))
+        jtis = result.all()
+
+    bloom = BloomFilter(
+        max(settings.REVOCATION_BLOOM_CAPACITY, 2 * len(jtis)),
+        settings.REVOCATION_BLOOM_ERROR_RATE,
+    )
+    for jti in jtis:
+        bloom.add(jti)
+    _filter, _synced_at, _rebuilt_at = bloom, now, time.monotonic()
+    _stats["rebuilds"] += 1
+
+
+async def sync_revocation_filter():
+    """Add jtis revoked since the last sync (by any worker) to the local filter."""
+    global _synced_at
+    if _synced_at is None:
+        await rebuild_revocation_filter()
+        return
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(
+            select(RevokedToken.jti).where(RevokedToken.revoked_at >= _synced_at - SYNC_OVERLAP)
+        )
+        jtis = result.all()
+    for jti in jtis:
+        if jti not in _filter:
+            _filter.add(jti)
+    _synced_at = now
+    _stats["syncs"] += 1
+
+
+async def revocation_sync_loop():
+    """Background task started from lifespan: incremental sync plus periodic full rebuild."""
+    while True:
+        await asyncio.sleep(settings.REVOCATION_SYNC_INTERVAL)
+        try:
+            if time.monotonic() - _rebuilt_at >= settings.REVOCATION_REBUILD_INTERVAL:
+                await rebuild_revocation_filter()
+            else:
+                await sync_revocation_filter()
+        except Exception:
+            logger.exception("Revocation filter sync failed")
+
+
+async def revoke_access_token(session: AsyncSession, jti: str, expires_at: datetime, user_id: Optional[int] = None):
+    """
+    Record a revoked access token. The caller commits; this worker sees it at
+    once, other workers on the "revoked" event (a filter entry that arrives
+    before the commit only costs an exact lookup). Revoking the same token
+    twice (concurrent logouts) is a no-op.
+    """
+    await session.execute(insert_ignore(
+        RevokedToken, {"jti": jti, "user_id": user_id, "expires_at": expires_at}, ["jti"],
+        dialect=session.bind.dialect,
+    ))
+    _filter.add(jti)
+    publish("revoked", jti)
+
+
+def _on_revoked_event(jti: Optional[str]):
+    if jti and jti not in _filter:
+        _filter.add(jti)
+
+
+subscribe("revoked", _on_revoked_event)
+on_full_flush(rebuild_revocation_filter)
+
+
+async def is_access_token_revoked(session: AsyncSession, jti: Optional[str]) -> bool:
+    """
+    Filter miss: definitely not revoked, no query. Filter hit: confirm with an
+    exact primary-key lookup (the filter has false positives).
+    """
+    _stats["checks"] += 1
+    if not jti or jti not in _filter:
+        return False
+    _stats["filter_hits"] += 1
+    revoked = await session.get(RevokedToken, jti) is not None
+    if revoked:
+        _stats["confirmed"] += 1
+    return revoked
+
+
+def revocation_stats() -> dict:
+    return {
+        **_stats,
+        "entries": _filter.count,
+        "filter_bits": _filter.size,
+        "filter_hashes": _filter.hashes,
+        "synced_at": _synced_at,
+    }
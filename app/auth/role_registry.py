@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from fastapi import HTTPException
+from sqlmodel import select
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.invalidation import on_full_flush, subscribe
+from app.models.user import PrincipalRole, Role
+
+logger = logging.getLogger(__name__)
+
+# The role table has a handful of rows and almost never changes: keep it in
+# memory (loaded at startup, reloaded after role CRUD, on "roles" invalidation
+# events from other workers and periodically as a fallback).
+_by_name: dict[str, PrincipalRole] = {}
+_by_id: dict[int, PrincipalRole] = {}
+_loaded_at = 0.0
+# Don't reload more often than this when an unknown role id is seen
+MISS_RELOAD_INTERVAL = 1.0
+
+
+async def load_roles():
+    global _by_name, _by_id, _loaded_at
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(select(Role.id, Role.name))
+        roles = [PrincipalRole(id=role_id, name=name) for role_id, name in result.all()]
+    _by_name = {r.name: r for r in roles}
+    _by_id = {r.id: r for r in roles}
+    _loaded_at = time.monotonic()
+
+
+def get_role(name: str) -> Optional[PrincipalRole]:
+    return _by_name.get(name)
+
+
+def require_role(name: str) -> PrincipalRole:
+    role = _by_name.get(name)
+    if role is None:
+        raise HTTPException(status_code=404, detail="Role not found")
+    return role
+
+
+async def get_role_by_id(role_id: int) -> Optional[PrincipalRole]:
+    """Registry lookup; an unknown id (role created on another worker) triggers one reload."""
+    role = _by_id.get(role_id)
+    if role is None and time.monotonic() - _loaded_at >= MISS_RELOAD_INTERVAL:
+        await load_roles()
+        role = _by_id.get(role_id)
+    return role
+
+
+async def role_name(role_id: int, default: str = "unknown") -> str:
+    role = await get_role_by_id(role_id)
+    return role.name if role else default
+
+
+subscribe("roles", lambda _key: load_roles())
+on_full_flush(load_roles)
+
+
+async def role_registry_refresh_loop():
+    """Background task started from lifespan."""
+    while True:
+        await asyncio.sleep(settings.ROLE_REGISTRY_REFRESH_INTERVAL)
+        try:
+            await load_roles()
+        except Exception:
+            logger.exception("Role registry refresh failed")
+
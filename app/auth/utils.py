@@ -1,13 +1,22 @@
+import asyncio
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
+from app.config import settings
+from app.db import AsyncSessionLocal
+from sqlalchemy import delete, or_
 from sqlmodel import Session, select
-from app.models.quiz import Question, Quiz, QuizAttempt, QuizResult
+from app.models.quiz import Question, Quiz, QuizAnswer, QuizAttempt, QuizResult
 from app.models.user import RefreshToken
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload
 from app.schemas.quiz_schema import QuizAnswerRead, QuizAttemptRead
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below min_rounds (e.g. bulk-provisioned accounts) are upgraded at login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__min_rounds=12)
 
 
 def verify_password(plain_password, hashed_password):
@@ -18,6 +27,111 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+def password_needs_rehash(hashed_password) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+def hash_passwords(passwords: list[str], rounds: int | None = None) -> list[str]:
+    """Hash a batch of passwords (process-pool entry point for bulk provisioning)."""
+    hasher = pwd_context.handler("bcrypt").using(rounds=rounds) if rounds else pwd_context
+    return [hasher.hash(password) for password in passwords]
+
+
+# ---------------------
+# Off-loop hashing: bcrypt costs ~100 ms of CPU per call, so never run it on
+# the event loop. The bcrypt backend releases the GIL, so a small thread pool
+# gives real parallelism; the semaphore caps it and lets us measure queueing.
+# ---------------------
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY,
+    thread_name_prefix="password-hash",
+)
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
+_hash_stats = {
+    "waiting": 0,
+    "running": 0,
+    "completed": 0,
+    "max_waiting": 0,
+    "wait_seconds_total": 0.0,
+    "hash_seconds_total": 0.0,
+}
+
+
+async def _run_password_hashing(fn, *args):
+    queued_at = time.perf_counter()
+    _hash_stats["waiting"] += 1
+    _hash_stats["max_waiting"] = max(_hash_stats["max_waiting"], _hash_stats["waiting"])
+    try:
+        await _hash_slots.acquire()
+    finally:
+        _hash_stats["waiting"] -= 1
+
+    started_at = time.perf_counter()
+    _hash_stats["wait_seconds_total"] += started_at - queued_at
+    _hash_stats["running"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_slots.release()
+        _hash_stats["running"] -= 1
+        _hash_stats["completed"] += 1
+        _hash_stats["hash_seconds_total"] += time.perf_counter() - started_at
+
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await _run_password_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password) -> str:
+    return await _run_password_hashing(get_password_hash, password)
+
+
+def password_hash_stats() -> dict:
+    """Queue depth and timing of the password hashing pool."""
+    return {
+        **_hash_stats,
+        "concurrency": settings.PASSWORD_HASH_CONCURRENCY,
+    }
+
+
+
+
+logger = logging.getLogger(__name__)
+
+
+def hash_refresh_token(token: str) -> str:
+    """Refresh tokens are stored and looked up by their SHA-256 digest only."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def purge_refresh_tokens(batch_size: int = settings.REFRESH_TOKEN_PURGE_BATCH) -> int:
+    """Delete expired and revoked refresh tokens in batches; returns rows deleted."""
+    deleted = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            doomed = (
+                select(RefreshToken.id)
+                .where(or_(RefreshToken.revoked.is_(True), RefreshToken.expires_at < datetime.utcnow()))
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await session.execute(delete(RefreshToken).where(RefreshToken.id.in_(doomed)))
+            await session.commit()
+        deleted += result.rowcount or 0
+        if (result.rowcount or 0) < batch_size:
+            return deleted
+
+
+async def refresh_token_purge_loop():
+    """Periodic purge task started from lifespan."""
+    while True:
+        await asyncio.sleep(settings.REFRESH_TOKEN_PURGE_INTERVAL)
+        try:
+            deleted = await purge_refresh_tokens()
+            if deleted:
+                logger.info("Purged %s expired/revoked refresh tokens", deleted)
+        except Exception:
+            logger.exception("Refresh token purge failed")
 
 
 # 1. Save Refresh Token
@@ -26,7 +140,7 @@ async def save_refresh_token(session: AsyncSession, user_id: int, token: str, ex
     Save a refresh token in DB (default expiry = 7 days).
     """
     expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-    refresh = RefreshToken(user_id=user_id, token=token, expires_at=expires_at)
+    refresh = RefreshToken(user_id=user_id, token_hash=hash_refresh_token(token), expires_at=expires_at)
     session.add(refresh)
     await session.commit()
     await session.refresh(refresh)
@@ -38,7 +152,7 @@ def is_valid_refresh_token(session: Session, token: str) -> bool:
     """
     Check if refresh token exists, not expired, and not revoked.
     """
-    db_token = session.exec(select(RefreshToken).where(RefreshToken.token == token)).first()
+    db_token = session.exec(select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token))).first()
     if not db_token:
         return False
     if db_token.revoked:
@@ -53,7 +167,7 @@ def update_refresh_token(session: Session, old_token: str, new_token: str, expir
     """
     Replace old refresh token with a new one (rotation).
     """
-    db_token = session.exec(select(RefreshToken).where(RefreshToken.token == old_token)).first()
+    db_token = session.exec(select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(old_token))).first()
     if not db_token:
         return None
     
@@ -63,7 +177,7 @@ def update_refresh_token(session: Session, old_token: str, new_token: str, expir
 
     # add new one
     expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-    new_refresh = RefreshToken(user_id=db_token.user_id, token=new_token, expires_at=expires_at)
+    new_refresh = RefreshToken(user_id=db_token.user_id, token_hash=hash_refresh_token(new_token), expires_at=expires_at)
     session.add(new_refresh)
 
     session.commit()
@@ -76,7 +190,7 @@ def revoke_refresh_token(session: Session, token: str):
     """
     Mark a refresh token as revoked (logout).
     """
-    db_token = session.exec(select(RefreshToken).where(RefreshToken.token == token)).first()
+    db_token = session.exec(select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token))).first()
     if db_token:
         db_token.revoked = True
         session.add(db_token)
@@ -85,6 +199,18 @@ def revoke_refresh_token(session: Session, token: str):
     return False
 
 
+def score_attempt(questions: list[Question], answers: list[QuizAnswer]) -> int:
+    """Marks earned by the saved answers of an attempt (unanswered = wrong)."""
+    total_score = 0
+    for question in questions:
+        db_answer = next((a for a in answers if a.question_id == question.id), None)
+        if db_answer and db_answer.selected_option_id:
+            selected_option = next((o for o in question.options if o.id == db_answer.selected_option_id), None)
+            if selected_option and selected_option.is_correct:
+                total_score += question.marks
+    return total_score
+
+
 # Force submit an attempt
 async def force_submit_attempt(session: AsyncSession, attempt: QuizAttempt) -> QuizAttempt:
     """Force-submit an attempt if deadline passed (unanswered = wrong)."""
@@ -101,13 +227,7 @@ async def force_submit_attempt(session: AsyncSession, attempt: QuizAttempt) -> Q
     attempt = result.scalar_one()
 
     if attempt.submitted_at is None:
-        total_score = 0
-        for question in attempt.quiz.questions:
-            db_answer = next((a for a in attempt.answers if a.question_id == question.id), None)
-            if db_answer and db_answer.selected_option_id:
-                selected_option = next((o for o in question.options if o.id == db_answer.selected_option_id), None)
-                if selected_option and selected_option.is_correct:
-                    total_score += question.marks
+        total_score = score_attempt(attempt.quiz.questions, attempt.answers)
 
         attempt.submitted_at = datetime.utcnow()
         result_obj = QuizResult(
@@ -0,0 +1,39 @@
+"""
+Operational commands.
+
+    python -m app.cli seed           # default roles + admin user (idempotent)
+    python -m app.cli check-schema   # fail if `alembic upgrade head` is pending
+"""
+import argparse
+import asyncio
+from app.auth.admin import create_admin
+from app.crud.role_crud import create_auto_roles
+from app.db import check_schema_revision, engine
+
+
+async def seed():
+    await create_auto_roles()
+    await create_admin()
+    print("Seeded default roles and admin user")
+
+
+async def check_schema():
+    await check_schema_revision()
+    print("Database schema is up to date")
+
+
+COMMANDS = {"seed": seed, "check-schema": check_schema}
+
+
+async def _run(command: str):
+    try:
+        await COMMANDS[command]()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quiz app operational commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    asyncio.run(_run(args.command))
@@ -1,11 +1,130 @@
+import os
 from starlette.config import Config
 from starlette.datastructures import Secret
 try:
    config = Config(".env")
 except FileNotFoundError:
    config = Config()
+# Required: postgresql(+asyncpg)://... in production. SQLite is opt-in for local
+# development by setting it explicitly (see .env.example); benchmarks set their own.
 DATABASE_URL = config("DATABASE_URL", cast=Secret)
 
 def get_db_url() -> str:
     # Convert Secret to normal string
-    return str(DATABASE_URL)
\ No newline at end of file
+    return str(DATABASE_URL)
+
+# Process pool size used to parse multi-quiz imports and hash bulk-provisioned passwords
+IMPORT_WORKERS = config("IMPORT_WORKERS", cast=int, default=os.cpu_count() or 2)
+# Zip imports are refused (before extracting) beyond these limits
+IMPORT_ZIP_MAX_MEMBERS = config("IMPORT_ZIP_MAX_MEMBERS", cast=int, default=200)
+IMPORT_ZIP_MAX_MEMBER_BYTES = config("IMPORT_ZIP_MAX_MEMBER_BYTES", cast=int, default=50 * 1024 * 1024)
+IMPORT_ZIP_MAX_TOTAL_BYTES = config("IMPORT_ZIP_MAX_TOTAL_BYTES", cast=int, default=200 * 1024 * 1024)
+IMPORT_ZIP_MAX_RATIO = config("IMPORT_ZIP_MAX_RATIO", cast=float, default=100.0)  # uncompressed / compressed
+
+# Background jobs (imports / exports / purges)
+JOB_WORKERS = config("JOB_WORKERS", cast=int, default=2)
+JOB_POLL_INTERVAL = config("JOB_POLL_INTERVAL", cast=float, default=1.0)
+JOB_STALE_SECONDS = config("JOB_STALE_SECONDS", cast=int, default=300)
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", cast=int, default=3)
+# Finished jobs (and their upload / export files) are deleted after this many days
+JOB_RETENTION_DAYS = config("JOB_RETENTION_DAYS", cast=float, default=7.0)
+JOB_PURGE_INTERVAL = config("JOB_PURGE_INTERVAL", cast=float, default=3600.0)
+JOB_PURGE_BATCH = config("JOB_PURGE_BATCH", cast=int, default=500)
+# Job uploads and results are stored in the jobfile table; larger uploads get 413
+JOB_FILE_MAX_BYTES = config("JOB_FILE_MAX_BYTES", cast=int, default=50 * 1024 * 1024)
+
+# Max concurrent bcrypt hash/verify calls per worker (run in a thread pool)
+PASSWORD_HASH_CONCURRENCY = config("PASSWORD_HASH_CONCURRENCY", cast=int, default=os.cpu_count() or 2)
+
+# In-process cache of authenticated principals (user id + role) per token subject
+PRINCIPAL_CACHE_TTL = config("PRINCIPAL_CACHE_TTL", cast=float, default=30.0)
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", cast=int, default=10000)
+
+# Periodic purge of expired / revoked refresh tokens
+REFRESH_TOKEN_PURGE_INTERVAL = config("REFRESH_TOKEN_PURGE_INTERVAL", cast=float, default=3600.0)
+REFRESH_TOKEN_PURGE_BATCH = config("REFRESH_TOKEN_PURGE_BATCH", cast=int, default=5000)
+
+# Revoked access-token ids: Bloom filter refreshed from the revokedtoken table
+REVOCATION_SYNC_INTERVAL = config("REVOCATION_SYNC_INTERVAL", cast=float, default=2.0)
+REVOCATION_REBUILD_INTERVAL = config("REVOCATION_REBUILD_INTERVAL", cast=float, default=300.0)
+REVOCATION_BLOOM_CAPACITY = config("REVOCATION_BLOOM_CAPACITY", cast=int, default=100000)
+REVOCATION_BLOOM_ERROR_RATE = config("REVOCATION_BLOOM_ERROR_RATE", cast=float, default=0.001)
+
+# bcrypt cost for bulk-provisioned accounts. Lower values onboard large rosters
+# faster; such hashes are re-hashed at the standard cost on the user's first login.
+PROVISION_PASSWORD_ROUNDS = config("PROVISION_PASSWORD_ROUNDS", cast=int, default=12)
+
+# Role registry (name <-> id) reload period, picks up role changes made by other workers
+ROLE_REGISTRY_REFRESH_INTERVAL = config("ROLE_REGISTRY_REFRESH_INTERVAL", cast=float, default=30.0)
+
+# Login / signup throttling (token buckets: burst size + refill per minute).
+# Password guessing is throttled per username; the per-IP buckets only stop
+# floods, and stay well above a classroom (hundreds of students behind one NAT
+# address all logging in when an exam opens).
+LOGIN_IP_BURST = config("LOGIN_IP_BURST", cast=int, default=1000)
+LOGIN_IP_PER_MINUTE = config("LOGIN_IP_PER_MINUTE", cast=float, default=600.0)
+LOGIN_USERNAME_BURST = config("LOGIN_USERNAME_BURST", cast=int, default=5)
+LOGIN_USERNAME_PER_MINUTE = config("LOGIN_USERNAME_PER_MINUTE", cast=float, default=5.0)
+SIGNUP_IP_BURST = config("SIGNUP_IP_BURST", cast=int, default=200)
+SIGNUP_IP_PER_MINUTE = config("SIGNUP_IP_PER_MINUTE", cast=float, default=60.0)
+RATE_LIMIT_MAX_KEYS = config("RATE_LIMIT_MAX_KEYS", cast=int, default=100000)
+# Also charge attempts to buckets in the database so limits hold across workers
+RATE_LIMIT_SHARED = config("RATE_LIMIT_SHARED", cast=bool, default=False)
+RATE_LIMIT_PURGE_INTERVAL = config("RATE_LIMIT_PURGE_INTERVAL", cast=float, default=600.0)
+# Take the client IP from X-Forwarded-For (only behind a trusted proxy)
+RATE_LIMIT_TRUST_FORWARDED = config("RATE_LIMIT_TRUST_FORWARDED", cast=bool, default=False)
+
+# Database engine. Size pools per process: total server connections are roughly
+# processes x (DB_POOL_SIZE + DB_MAX_OVERFLOW), which must stay under
+# max_connections (or the PgBouncer pool) with headroom for migrations/admin.
+DB_ECHO = config("DB_ECHO", cast=bool, default=False)
+DB_POOL_SIZE = config("DB_POOL_SIZE", cast=int, default=5)          # 0 = no client-side pool
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", cast=int, default=10)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", cast=float, default=30.0)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", cast=int, default=1800)  # seconds, -1 = never
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", cast=bool, default=True)
+DB_STATEMENT_CACHE_SIZE = config("DB_STATEMENT_CACHE_SIZE", cast=int, default=100)  # asyncpg, per connection
+# PgBouncer in transaction/statement pooling mode: disable prepared-statement caching
+DB_PGBOUNCER = config("DB_PGBOUNCER", cast=bool, default=False)
+
+# Fast boot: schema is managed by Alembic only (startup checks the revision
+# instead of running create_all) and roles/admin are seeded once with
+# `python -m app.cli seed`. Off by default so a fresh dev database just works.
+FAST_BOOT = config("FAST_BOOT", cast=bool, default=False)
+
+# Cross-worker cache invalidation (PostgreSQL LISTEN/NOTIFY; ignored on SQLite)
+INVALIDATION_BUS = config("INVALIDATION_BUS", cast=bool, default=True)
+INVALIDATION_CHANNEL = config("INVALIDATION_CHANNEL", default="quiz_app_invalidation")
+INVALIDATION_RECONNECT_DELAY = config("INVALIDATION_RECONNECT_DELAY", cast=float, default=1.0)
+INVALIDATION_HEARTBEAT = config("INVALIDATION_HEARTBEAT", cast=float, default=30.0)
+
+# Prometheus /metrics endpoint (per worker). Only served once METRICS_TOKEN is set;
+# scrapers send it as a Bearer token.
+METRICS_ENABLED = config("METRICS_ENABLED", cast=bool, default=True)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Development / diagnostics: per-request query counts in X-Query-* headers and N+1 warnings in the log
+QUERY_AUDIT = config("QUERY_AUDIT", cast=bool, default=False)
+QUERY_AUDIT_REPEAT_THRESHOLD = config("QUERY_AUDIT_REPEAT_THRESHOLD", cast=int, default=3)
+QUERY_AUDIT_WARN_COUNT = config("QUERY_AUDIT_WARN_COUNT", cast=int, default=20)
+
+# Logging: records go through a queue to a writer thread (see app/log.py)
+LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+LOG_FORMAT = config("LOG_FORMAT", default="json")  # json | text
+LOG_QUEUE_SIZE = config("LOG_QUEUE_SIZE", cast=int, default=10000)
+# Share of high-volume (sampled) debug/info events that are kept
+LOG_SAMPLE_RATE = config("LOG_SAMPLE_RATE", cast=float, default=0.1)
+
+# Admission control for exam-start bursts (get-or-create-attempt), per worker:
+# at most CONCURRENCY attempt starts at once (by default one under the pool
+# size, so other routes still get a connection during the burst), up to QUEUE
+# more wait in FIFO order for at most MAX_WAIT seconds; beyond that, 503 with a
+# jittered Retry-After.
+ADMISSION_CONTROL = config("ADMISSION_CONTROL", cast=bool, default=True)
+ADMISSION_ATTEMPT_CONCURRENCY = config(
+    "ADMISSION_ATTEMPT_CONCURRENCY", cast=int, default=max(1, DB_POOL_SIZE - 1) if DB_POOL_SIZE else 10
+)
+ADMISSION_ATTEMPT_QUEUE = config("ADMISSION_ATTEMPT_QUEUE", cast=int, default=500)
+ADMISSION_ATTEMPT_MAX_WAIT = config("ADMISSION_ATTEMPT_MAX_WAIT", cast=float, default=10.0)
+ADMISSION_RETRY_AFTER = config("ADMISSION_RETRY_AFTER", cast=float, default=2.0)   # minimum, seconds
+ADMISSION_RETRY_JITTER = config("ADMISSION_RETRY_JITTER", cast=float, default=1.0)  # up to +100%
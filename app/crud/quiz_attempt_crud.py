@@ -1,4 +1,5 @@
 # app/crud/quiz_attempt_crud.py
+import logging
 from datetime import datetime, timedelta, timezone
 from random import shuffle
 from typing import Annotated
@@ -14,6 +15,8 @@ from app.schemas.quiz_schema import QuizAnswerBase, QuizAnswerRead, QuizAttemptC
 from sqlalchemy.orm import selectinload
 from sqlalchemy import delete, func
 
+logger = logging.getLogger(__name__)
+
 
 async def create_quiz_attempt(
     session: AsyncSession,
@@ -172,6 +175,20 @@ async def delete_attempt(session: Annotated[AsyncSession, Depends(get_session)],
     return attempt
 
 
+def build_shuffle_data(questions: list[Question]) -> dict:
+    """Random question order plus a random option order per question (keys are str for JSON)."""
+    question_ids = [q.id for q in questions]
+    shuffle(question_ids)
+
+    option_map = {}
+    for q in questions:
+        option_ids = [o.id for o in q.options]
+        shuffle(option_ids)
+        option_map[str(q.id)] = option_ids
+
+    return {"questions": question_ids, "options": option_map}
+
+
 async def get_or_create_quiz_attempt(
     quiz_id: int,
     session: AsyncSession = Depends(get_session),
@@ -207,19 +224,7 @@ async def get_or_create_quiz_attempt(
 
         # Generate shuffle_data if missing (for old attempts)
         if unfinished_attempt.shuffle_data is None and quiz.questions:
-            question_ids = [q.id for q in quiz.questions]
-            shuffle(question_ids)
-
-            option_map = {}
-            for q in quiz.questions:
-                option_ids = [o.id for o in q.options]
-                shuffle(option_ids)
-                option_map[str(q.id)] = option_ids
-
-            unfinished_attempt.shuffle_data = {
-                "questions": question_ids,
-                "options": option_map
-            }
+            unfinished_attempt.shuffle_data = build_shuffle_data(quiz.questions)
             session.add(unfinished_attempt)
             await session.commit()
 
@@ -262,16 +267,7 @@ async def get_or_create_quiz_attempt(
             return serialize_attempt(last_attempt)
 
     # 3️⃣ Create new attempt with shuffle
-    question_ids = [q.id for q in quiz.questions]
-    shuffle(question_ids)
-
-    option_map = {}
-    for q in quiz.questions:
-        option_ids = [o.id for o in q.options]
-        shuffle(option_ids)
-        option_map[str(q.id)] = option_ids
-
-    shuffle_data = {"questions": question_ids, "options": option_map}
+    shuffle_data = build_shuffle_data(quiz.questions)
 
     attempt_number = (last_attempt.attempt_number + 1) if last_attempt else 1
     new_attempt = QuizAttempt(
@@ -288,19 +284,52 @@ async def get_or_create_quiz_attempt(
     await session.commit()
 
     # Re-fetch attempt with eager-loading to avoid lazy load errors
+    # (populate_existing: the new object is still in the identity map, options would be skipped)
     new_attempt = await session.get(
         QuizAttempt,
         new_attempt.id,
         options=[
             selectinload(QuizAttempt.answers),
             selectinload(QuizAttempt.quiz).selectinload(Quiz.questions).selectinload(Question.options)
-        ]
+        ],
+        populate_existing=True,
     )
 
-    print(f"✅ New attempt created: {new_attempt.id} with shuffle_data:", new_attempt.shuffle_data)
+    logger.info(
+        "New attempt created",
+        extra={"attempt_id": new_attempt.id, "quiz_id": quiz_id, "user_id": current_user.id,
+               "questions": len(shuffle_data["questions"]), "sampled": True},
+    )
     return serialize_attempt(new_attempt)
 
 
+def grade_submission(
+    attempt_id: int,
+    questions: list[Question],
+    answers_data: list[QuizAnswerBase],
+) -> tuple[int, list[QuizAnswer]]:
+    """Score submitted answers; returns (total score, answer rows to insert). Unknown questions are skipped."""
+    total_score = 0
+    quiz_answers = []
+    for ans in answers_data:
+        question = next((q for q in questions if q.id == ans.question_id), None)
+        if not question:
+            continue
+
+        selected_option = next((o for o in question.options if o.id == ans.selected_option_id), None)
+        is_correct = selected_option.is_correct if selected_option else False
+        if is_correct:
+            total_score += question.marks
+
+        quiz_answers.append(QuizAnswer(
+            attempt_id=attempt_id,
+            question_id=question.id,
+            selected_option_id=ans.selected_option_id,
+            is_correct=is_correct
+        ))
+    return total_score, quiz_answers
+
+
 async def submit_quiz_attempt(
     session: AsyncSession,
     attempt_id: int,
@@ -329,24 +358,8 @@ async def submit_quiz_attempt(
         await session.exec(delete(QuizAnswer).where(QuizAnswer.attempt_id == attempt.id))
         await session.commit()
 
-    total_score = 0
-    for ans in answers_data:
-        question = next((q for q in attempt.quiz.questions if q.id == ans.question_id), None)
-        if not question:
-            continue
-
-        selected_option = next((o for o in question.options if o.id == ans.selected_option_id), None)
-        is_correct = selected_option.is_correct if selected_option else False
-        if is_correct:
-            total_score += question.marks
-
-        quiz_answer = QuizAnswer(
-            attempt_id=attempt.id,
-            question_id=question.id,
-            selected_option_id=ans.selected_option_id,
-            is_correct=is_correct
-        )
-        session.add(quiz_answer)
+    total_score, quiz_answers = grade_submission(attempt.id, attempt.quiz.questions, answers_data)
+    session.add_all(quiz_answers)
 
     attempt.submitted_at = datetime.utcnow()
     await session.commit()
@@ -4,14 +4,20 @@ from fastapi import Depends, File, HTTPException, UploadFile
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 from app.auth.admin import admin_required, user_required
+from app.crud.quiz_import_crud import (
+    TEMPLATE_COLUMNS, bulk_insert_quiz, list_quiz_sources, parse_quiz_file, parse_quiz_sources,
+    quiz_import_summary, validate_quiz_file,
+)
 from app.db import get_session
 from app.models.quiz import Option, Question, Quiz, QuizAttempt
 from app.models.user import User
 from app.schemas.quiz_schema import QuizAttemptSummary, QuizCreate, QuizHistoryRead, QuizUpdate
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
-import pandas as pd
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import io
+import tempfile
 
 async def get_all_quizzes(
     session: Annotated[AsyncSession, Depends(get_session)],
@@ -198,8 +204,11 @@ async def get_user_quiz_history(
         )
     )
 
-    attempts = result.all()
+    return summarize_quiz_history(result.all())
 
+
+def summarize_quiz_history(attempts: list[QuizAttempt]) -> List[QuizHistoryRead]:
+    """Per-quiz totals over submitted attempts (quiz, questions, options, result and answers loaded)."""
     # Aggregate per quiz
     quizzes: dict[int, dict] = {}
 
@@ -279,90 +288,91 @@ async def import_quiz(
     session: AsyncSession,
     admin: User,
     file: UploadFile,
+    dry_run: bool = False,
 ):
     if not file.filename.endswith((".xlsx", ".xls")):
         raise HTTPException(status_code=400, detail="Invalid file format. Upload an Excel file.")
 
-    # Read Excel with pandas
-    df = pd.read_excel(file.file)
-
-    # Validate mandatory columns
-    required_cols = ["Quiz Title", "Quiz Description", "Time Limit", "Question Text", 
-                     "Option A", "Option B", "Option C", "Option D", "Correct Option"]
-    missing_cols = [col for col in required_cols if col not in df.columns]
-    if missing_cols:
-        raise HTTPException(status_code=400, detail=f"Missing required columns: {missing_cols}")
-
-    # Extract quiz info from first row
-    quiz_title = df.iloc[0]["Quiz Title"]
-    description = df.iloc[0]["Quiz Description"]
-    total_time = int(df.iloc[0]["Time Limit"])
-
-    # Handle optional Max Attempts
-    max_attempts = None
-    if "Max Attempts" in df.columns:
-        val = df.iloc[0]["Max Attempts"]
-        if pd.notna(val):
-            max_attempts = int(val)
-
-    # Create quiz
-    quiz = Quiz(
-        title=quiz_title,
-        description=description,
-        total_time=total_time,
-        max_attempts=max_attempts
-    )
-    session.add(quiz)
+    # Dry run: validate every row and report, without touching the database
+    if dry_run:
+        report = await run_in_threadpool(validate_quiz_file, file.file, file.filename)
+        return {
+            "message": "Sheet is valid" if report["valid"] else f"Sheet has {report['error_count']} errors",
+            "dry_run": True,
+            **report,
+        }
+
+    # Parse the sheet in a worker thread so the event loop keeps serving requests
+    parsed = await run_in_threadpool(parse_quiz_file, file.file, file.filename)
+
+    # Quiz, questions and options go in with bulk inserts inside one transaction
+    quiz = await bulk_insert_quiz(session, parsed)
     await session.commit()
-    await session.refresh(quiz)
 
-    # Add questions + options
-    for _, row in df.iterrows():
-        # Handle optional Marks
-        marks = 1
-        if "Marks" in df.columns and pd.notna(row["Marks"]):
-            marks = int(row["Marks"])
-
-        question = Question(
-            quiz_id=quiz.id,
-            text=row["Question Text"],
-            marks=marks
-        )
-        session.add(question)
-        await session.commit()
-        await session.refresh(question)
-
-        # Add options
-        for idx, col in enumerate(["Option A", "Option B", "Option C", "Option D"]):
-            text = str(row[col]) if pd.notna(row[col]) else ""
-            option = Option(
-                question_id=question.id,
-                text=text,
-                is_correct=(chr(65 + idx) == str(row["Correct Option"]).strip())
-            )
-            session.add(option)
-        await session.commit()
+    return {
+        "message": f"Quiz '{quiz.title}' imported successfully",
+        "quiz": quiz_import_summary(quiz, len(parsed["questions"])),
+    }
 
+async def import_quizzes(
+    session: AsyncSession,
+    admin: User,
+    file: UploadFile,
+    progress=None,
+):
+    """
+    Import one quiz per sheet from a workbook, or from every workbook in a zip.
+    `progress` is an optional async callback (done, total) used by background jobs.
+    """
+    if not file.filename.endswith((".xlsx", ".xls", ".zip")):
+        raise HTTPException(status_code=400, detail="Invalid file format. Upload an Excel workbook or a zip of workbooks.")
+
+    with tempfile.TemporaryDirectory(prefix="quiz_import_") as workdir:
+        sources = await run_in_threadpool(list_quiz_sources, file.file, file.filename, workdir)
+        parsed_sheets = await parse_quiz_sources(sources)
+
+    results = []
+    for done, parsed in enumerate(parsed_sheets):
+        if progress:
+            await progress(done, len(parsed_sheets))
+        if "error" in parsed:
+            results.append({"source": parsed["source"], "status": "failed", **{
+                key: parsed[key] for key in ("error", "errors") if key in parsed
+            }})
+            continue
+        if not parsed["quiz"]["questions"]:
+            results.append({"source": parsed["source"], "status": "failed", "error": "The sheet has no questions"})
+            continue
+
+        # Each quiz gets its own savepoint so one bad sheet doesn't sink the batch
+        try:
+            async with session.begin_nested():
+                quiz = await bulk_insert_quiz(session, parsed["quiz"])
+        except SQLAlchemyError as e:
+            results.append({"source": parsed["source"], "status": "failed", "error": str(getattr(e, "orig", None) or e)})
+            continue
+
+        results.append({
+            "source": parsed["source"],
+            "status": "imported",
+            "quiz": quiz_import_summary(quiz, len(parsed["quiz"]["questions"])),
+        })
+
+    await session.commit()
+
+    imported = sum(1 for r in results if r["status"] == "imported")
     return {
-        "message": f"Quiz '{quiz_title}' imported successfully",
-        "quiz": {
-            "id": quiz.id,
-            "title": quiz.title,
-            "description": quiz.description,
-            "total_time": quiz.total_time,
-            "max_attempts": quiz.max_attempts,
-            "is_active": quiz.is_active,
-            "created_at": str(quiz.created_at),
-            "question_count": len(df),
-        },
+        "message": f"Imported {imported} of {len(results)} quizzes",
+        "imported": imported,
+        "failed": len(results) - imported,
+        "results": results,
     }
 
 async def export_quiz_template():
+    import pandas as pd  # heavy import, only needed here
+
     # Define columns (including optional ones)
-    columns = [
-        "Quiz Title", "Quiz Description", "Time Limit", "Max Attempts",
-        "Question Text", "Marks", "Option A", "Option B", "Option C", "Option D", "Correct Option"
-    ]
+    columns = TEMPLATE_COLUMNS
 
     # Create empty DataFrame with headers only
     df = pd.DataFrame(columns=columns)
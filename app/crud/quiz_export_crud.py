@@ -0,0 +1,265 @@
+# app/crud/quiz_export_crud.py
+"""
+Quiz exports in the import template layout (TEMPLATE_COLUMNS).
+
+xlsx is the round-trip format: one sheet per quiz, re-importable with
+/quiz/import-quizzes (a quiz without questions gets a header-only sheet,
+which the import reports as having no questions). csv and json are flat
+interchange formats for spreadsheets and other tools: one row (json: one
+object keyed by the template column names) per question of every selected
+quiz, with the quiz columns repeated on each row. The import endpoints do
+not accept them; quizzes without questions have no rows there.
+Only the first four options of a question fit the template.
+"""
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.crud.quiz_import_crud import CORRECT_OPTION_LETTERS, OPTION_COLUMNS, TEMPLATE_COLUMNS
+from app.db import AsyncSessionLocal
+from app.models.quiz import Option, Question, Quiz
+
+EXPORT_FORMATS = ("xlsx", "csv", "json")
+EXPORT_BATCH_SIZE = 1000
+STREAM_CHUNK_SIZE = 64 * 1024
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_MEDIA_TYPES = {"xlsx": XLSX_MEDIA_TYPE, "csv": "text/csv", "json": "application/json"}
+
+
+def _export_statement(quiz_ids: list[int]):
+    # One flat query: quiz x question x option, ordered so rows can be grouped on the fly
+    return (
+        select(
+            Quiz.id.label("quiz_id"),
+            Quiz.title,
+            Quiz.description,
+            Quiz.total_time,
+            Quiz.max_attempts,
+            Question.id.label("question_id"),
+            Question.text.label("question_text"),
+            Question.marks,
+            Option.text.label("option_text"),
+            Option.is_correct,
+        )
+        .outerjoin(Question, Question.quiz_id == Quiz.id)
+        .outerjoin(Option, Option.question_id == Question.id)
+        .where(Quiz.id.in_(quiz_ids))
+        .order_by(Quiz.id, Question.id, Option.id)
+    )
+
+
+def _template_row(question: dict) -> list:
+    """Build one import-template row; only the first four options fit the layout."""
+    options = question["options"][:len(OPTION_COLUMNS)]
+    texts = [text for text, _ in options] + [""] * (len(OPTION_COLUMNS) - len(options))
+    correct = next((CORRECT_OPTION_LETTERS[i] for i, (_, ok) in enumerate(options) if ok), "")
+    return [
+        question["title"],
+        question["description"],
+        question["total_time"],
+        question["max_attempts"],
+        question["text"],
+        question["marks"],
+        *texts,
+        correct,
+    ]
+
+
+def _export_item(current: dict) -> tuple[int, str, Optional[list]]:
+    row = _template_row(current) if current["question_id"] is not None else None
+    return current["quiz_id"], current["title"], row
+
+
+async def iter_export_rows(quiz_ids: list[int]) -> AsyncIterator[tuple[int, str, Optional[list]]]:
+    """
+    Yield (quiz_id, quiz title, template row) per question, streamed from the
+    database; a quiz without questions yields once with row None.
+    Uses its own session: the response body is produced after the request
+    dependencies have been torn down.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(_export_statement(quiz_ids))
+        current: Optional[dict] = None
+        async for r in result:
+            if current is None or (current["quiz_id"], current["question_id"]) != (r.quiz_id, r.question_id):
+                if current is not None:
+                    yield _export_item(current)
+                current = {
+                    "quiz_id": r.quiz_id,
+                    "question_id": r.question_id,
+                    "title": r.title,
+                    "description": r.description,
+                    "total_time": r.total_time,
+                    "max_attempts": r.max_attempts,
+                    "text": r.question_text,
+                    "marks": r.marks,
+                    "options": [],
+                }
+            if r.option_text is not None:
+                current["options"].append((r.option_text, r.is_correct))
+        if current is not None:
+            yield _export_item(current)
+
+
+async def _csv_stream(quiz_ids: list[int]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(TEMPLATE_COLUMNS)
+    async for _, _, row in iter_export_rows(quiz_ids):
+        if row is None:
+            continue
+        writer.writerow(row)
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def _json_stream(quiz_ids: list[int]):
+    # A JSON array of row objects keyed by the template column names
+    chunk = ["["]
+    size = 1
+    first = True
+    async for _, _, row in iter_export_rows(quiz_ids):
+        if row is None:
+            continue
+        item = ("" if first else ",") + json.dumps(dict(zip(TEMPLATE_COLUMNS, row)))
+        first = False
+        chunk.append(item)
+        size += len(item)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk, size = [], 0
+    chunk.append("]")
+    yield "".join(chunk)
+
+
+class _XlsxExport:
+    """Writes template rows into an xlsxwriter workbook, one sheet per quiz."""
+
+    def __init__(self, path: str):
+        import xlsxwriter
+
+        # constant_memory flushes each row to disk as soon as the next one starts
+        self.workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.sheet = None
+        self.quiz_id = None
+        self.row = 0
+        self.sheet_names: set[str] = set()
+
+    def _sheet_name(self, title: str) -> str:
+        base = re.sub(r"[\[\]:*?/\\]", " ", str(title or "Quiz")).strip()[:31] or "Quiz"
+        name, n = base, 1
+        while name.lower() in self.sheet_names:
+            n += 1
+            suffix = f" ({n})"
+            name = base[:31 - len(suffix)] + suffix
+        self.sheet_names.add(name.lower())
+        return name
+
+    def write(self, batch: list[tuple[int, str, Optional[list]]]):
+        for quiz_id, title, values in batch:
+            if quiz_id != self.quiz_id:
+                self.quiz_id = quiz_id
+                self.sheet = self.workbook.add_worksheet(self._sheet_name(title))
+                self.sheet.write_row(0, 0, TEMPLATE_COLUMNS)
+                self.row = 1
+            if values is None:
+                continue  # quiz without questions: header-only sheet
+            self.sheet.write_row(self.row, 0, values)
+            self.row += 1
+
+    def close(self):
+        if self.sheet is None:
+            self.workbook.add_worksheet("QuizTemplate").write_row(0, 0, TEMPLATE_COLUMNS)
+        self.workbook.close()
+
+
+async def _build_xlsx(quiz_ids: list[int]) -> str:
+    """Build the workbook in a temp file (batches written off the event loop)."""
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        export = await run_in_threadpool(_XlsxExport, path)
+        batch = []
+        async for item in iter_export_rows(quiz_ids):
+            batch.append(item)
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                await run_in_threadpool(export.write, batch)
+                batch = []
+        await run_in_threadpool(export.write, batch)
+        await run_in_threadpool(export.close)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def _file_stream(path: str):
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(STREAM_CHUNK_SIZE):
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+async def export_quizzes_to_file(quiz_ids: list[int], format: str, path: str) -> str:
+    """Write an export to `path` (used by background export jobs)."""
+    if format == "xlsx":
+        shutil.move(await _build_xlsx(quiz_ids), path)
+        return path
+
+    stream = _csv_stream(quiz_ids) if format == "csv" else _json_stream(quiz_ids)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        async for chunk in stream:
+            await run_in_threadpool(f.write, chunk)
+    return path
+
+
+async def validate_export_request(session: AsyncSession, quiz_ids: list[int], format: str) -> list[int]:
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Use one of {list(EXPORT_FORMATS)}")
+    quiz_ids = list(dict.fromkeys(quiz_ids))
+    if not quiz_ids:
+        raise HTTPException(status_code=400, detail="No quiz ids given")
+
+    result = await session.exec(select(Quiz.id).where(Quiz.id.in_(quiz_ids)))
+    missing = sorted(set(quiz_ids) - set(result.all()))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Quiz not found: {missing}")
+    return quiz_ids
+
+
+def export_filename(quiz_ids: list[int], format: str) -> str:
+    name = f"quiz_{quiz_ids[0]}" if len(quiz_ids) == 1 else "quizzes"
+    return f"{name}.{format}"
+
+
+async def export_quizzes(session: AsyncSession, quiz_ids: list[int], format: str = "xlsx"):
+    """
+    Export quizzes with their questions and options in the import template layout.
+    xlsx exports get one sheet per quiz (re-importable with /quiz/import-quizzes);
+    csv / json are flat, one row per question, and not accepted by the import.
+    """
+    quiz_ids = await validate_export_request(session, quiz_ids, format)
+    headers = {"Content-Disposition": f"attachment; filename={export_filename(quiz_ids, format)}"}
+
+    if format == "csv":
+        return StreamingResponse(_csv_stream(quiz_ids), media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+    if format == "json":
+        return StreamingResponse(_json_stream(quiz_ids), media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+
+    path = await _build_xlsx(quiz_ids)
+    return StreamingResponse(_file_stream(path), media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
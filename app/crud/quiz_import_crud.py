@@ -0,0 +1,420 @@
+# app/crud/quiz_import_crud.py
+import asyncio
+import math
+import multiprocessing
+import os
+import shutil
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.models.quiz import Option, Question, Quiz
+
+# Column layout of the import template (see export_quiz_template)
+REQUIRED_COLUMNS = [
+    "Quiz Title", "Quiz Description", "Time Limit", "Question Text",
+    "Option A", "Option B", "Option C", "Option D", "Correct Option",
+]
+OPTION_COLUMNS = ["Option A", "Option B", "Option C", "Option D"]
+CORRECT_OPTION_LETTERS = [chr(65 + idx) for idx in range(len(OPTION_COLUMNS))]
+# Full layout including the optional columns, in template order
+TEMPLATE_COLUMNS = [
+    "Quiz Title", "Quiz Description", "Time Limit", "Max Attempts",
+    "Question Text", "Marks", *OPTION_COLUMNS, "Correct Option",
+]
+
+
+def _cell(value):
+    """Normalise empty cells (None / NaN / blank string) to None."""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, str) and value == "":
+        return None
+    return value
+
+
+def _text(value) -> str:
+    value = _cell(value)
+    return str(value) if value is not None else ""
+
+
+def _whole_number(value, column: str, row: int) -> Optional[int]:
+    """A positive whole number cell (10, 10.0, "10"); None when blank, 400 otherwise."""
+    value = _cell(value)
+    if isinstance(value, str):
+        value = value.strip() or None
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not number.is_integer():
+        raise HTTPException(status_code=400, detail=f"Row {row}: '{column}' must be a whole number")
+    if number <= 0:
+        raise HTTPException(status_code=400, detail=f"Row {row}: '{column}' must be a positive whole number")
+    return int(number)
+
+
+def parse_quiz_rows(rows: Iterator[tuple]) -> dict:
+    """
+    Turn a stream of sheet rows (header first) into a plain quiz dict:
+    {"title", "description", "total_time", "max_attempts", "questions": [...]}.
+    Quiz metadata is taken from the first data row, like the template.
+    """
+    header = next(rows, None)
+    if header is None:
+        raise HTTPException(status_code=400, detail="The uploaded sheet is empty")
+
+    columns = [str(c) if c is not None else "" for c in header]
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_cols:
+        raise HTTPException(status_code=400, detail=f"Missing required columns: {missing_cols}")
+
+    index = {}
+    for i, name in enumerate(columns):
+        index.setdefault(name, i)
+
+    def get(values: tuple, name: str):
+        i = index.get(name)
+        return _cell(values[i]) if i is not None and i < len(values) else None
+
+    quiz: Optional[dict] = None
+    questions = []
+    for number, values in enumerate(rows, start=2):  # numbered as in the sheet (header = row 1)
+        if not values or all(_cell(v) is None for v in values):
+            continue  # skip blank rows (read-only sheets often carry trailing ones)
+
+        if quiz is None:
+            total_time = _whole_number(get(values, "Time Limit"), "Time Limit", number)
+            if total_time is None:
+                raise HTTPException(status_code=400, detail=f"Row {number}: 'Time Limit' must be a whole number")
+            quiz = {
+                "title": _text(get(values, "Quiz Title")),
+                "description": get(values, "Quiz Description"),
+                "total_time": total_time,
+                "max_attempts": _whole_number(get(values, "Max Attempts"), "Max Attempts", number),
+            }
+
+        marks = _whole_number(get(values, "Marks"), "Marks", number)
+        correct = _text(get(values, "Correct Option")).strip()
+        if not correct:
+            raise HTTPException(status_code=400, detail=f"Row {number}: 'Correct Option' is missing")
+        if correct not in CORRECT_OPTION_LETTERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Row {number}: 'Correct Option' must be one of {', '.join(CORRECT_OPTION_LETTERS)}",
+            )
+        questions.append({
+            "text": _text(get(values, "Question Text")),
+            "marks": marks if marks is not None else 1,
+            "options": [
+                (_text(get(values, col)), chr(65 + idx) == correct)
+                for idx, col in enumerate(OPTION_COLUMNS)
+            ],
+        })
+
+    if quiz is None:
+        raise HTTPException(status_code=400, detail="The uploaded sheet has no questions")
+
+    quiz["questions"] = questions
+    return quiz
+
+
+def _iter_xls_rows(file, sheet_name=None) -> Iterator[tuple]:
+    # Legacy .xls is not supported by openpyxl, fall back to pandas/xlrd
+    import pandas as pd
+
+    df = pd.read_excel(file, sheet_name=sheet_name if sheet_name is not None else 0)
+    yield tuple(df.columns)
+    yield from df.itertuples(index=False, name=None)
+
+
+def parse_quiz_file(file, filename: str, sheet_name: Optional[str] = None) -> dict:
+    """
+    Parse one sheet (the first by default) of an uploaded workbook without
+    loading it into a DataFrame.
+    Blocking: call it from a worker thread (run_in_threadpool) or process pool.
+    """
+    from openpyxl import load_workbook
+
+    file.seek(0)
+    if filename.endswith(".xls"):
+        return parse_quiz_rows(_iter_xls_rows(file, sheet_name))
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[0]
+        return parse_quiz_rows(sheet.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+# ===============================
+# Dry-run validation
+# ===============================
+
+
+def validate_quiz_frame(df) -> dict:
+    """
+    Validate a whole sheet with column-wise pandas operations and return a
+    row-level report. Rows are numbered as in Excel (header = row 1).
+    """
+    import pandas as pd
+
+    errors: list[dict] = []
+
+    def report(mask, column, message):
+        rows = mask[mask].index
+        messages = message[mask] if isinstance(message, pd.Series) else [message] * len(rows)
+        errors.extend(
+            {"row": int(row) + 2, "column": column, "message": msg}
+            for row, msg in zip(rows, messages)
+        )
+
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_cols:
+        errors.extend({"row": 1, "column": col, "message": "Missing required column"} for col in missing_cols)
+        return {"valid": False, "row_count": len(df), "error_count": len(errors), "errors": errors}
+
+    df = df.dropna(how="all")
+    if df.empty:
+        errors.append({"row": 2, "column": None, "message": "The sheet has no questions"})
+        return {"valid": False, "row_count": 0, "error_count": len(errors), "errors": errors}
+
+    checked = REQUIRED_COLUMNS + [col for col in ("Marks", "Max Attempts") if col in df.columns]
+    text = df[checked].astype("string").apply(lambda col: col.str.strip())
+    blank = text.isna() | text.eq("")
+
+    # Missing cells
+    for col in ["Question Text", *OPTION_COLUMNS, "Correct Option"]:
+        report(blank[col], col, "Missing value")
+
+    first = df.index[:1]
+    for col in ["Quiz Title", "Time Limit"]:
+        report(blank.loc[first, col], col, "Missing value (quiz details are read from the first row)")
+
+    # Correct option must name one of the option columns
+    report(
+        ~blank["Correct Option"] & ~text["Correct Option"].isin(CORRECT_OPTION_LETTERS),
+        "Correct Option",
+        f"Must be one of {', '.join(CORRECT_OPTION_LETTERS)}",
+    )
+
+    # Numeric columns
+    for col in ["Time Limit", "Marks", "Max Attempts"]:
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        present = ~blank[col]
+        report(present & values.isna(), col, "Must be a number")
+        report(present & values.notna() & ((values % 1 != 0) | (values <= 0)), col, "Must be a positive whole number")
+
+    # Duplicate questions (case/whitespace-insensitive)
+    key = text["Question Text"].str.lower()
+    duplicated = ~blank["Question Text"] & key.duplicated(keep="first")
+    first_row = pd.Series(df.index, index=df.index).groupby(key).transform("min")
+    report(duplicated, "Question Text", "Duplicate of row " + (first_row + 2).astype("Int64").astype("string"))
+
+    errors.sort(key=lambda e: e["row"])
+    return {"valid": not errors, "row_count": len(df), "error_count": len(errors), "errors": errors}
+
+
+def validate_quiz_file(file, filename: str, sheet_name: Optional[str] = None) -> dict:
+    """
+    Read one sheet (the first by default) into a DataFrame and validate it.
+    Blocking: run in a worker thread or process pool.
+    """
+    import pandas as pd
+
+    file.seek(0)
+    df = pd.read_excel(file, sheet_name=sheet_name if sheet_name is not None else 0, dtype=object)
+    return validate_quiz_frame(df)
+
+
+# ===============================
+# Batch import (many sheets / zip of workbooks)
+# ===============================
+_import_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_import_pool() -> ProcessPoolExecutor:
+    global _import_pool
+    if _import_pool is None:
+        # spawn: never fork a process that already runs the event loop + DB threads
+        _import_pool = ProcessPoolExecutor(
+            max_workers=settings.IMPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _import_pool
+
+
+def shutdown_import_pool():
+    global _import_pool
+    if _import_pool is not None:
+        _import_pool.shutdown(cancel_futures=True)
+        _import_pool = None
+
+
+def _sheet_names(path: str, filename: str) -> list[str]:
+    if filename.endswith(".xls"):
+        import pandas as pd
+
+        with pd.ExcelFile(path) as workbook:
+            return list(workbook.sheet_names)
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _zip_workbooks(archive: zipfile.ZipFile) -> list[zipfile.ZipInfo]:
+    """
+    The Excel members of a zip, checked against the IMPORT_ZIP_* limits from
+    the central directory before anything is extracted (zip bombs).
+    """
+    entries = archive.infolist()
+    if len(entries) > settings.IMPORT_ZIP_MAX_MEMBERS:
+        raise HTTPException(
+            status_code=400, detail=f"The zip archive has more than {settings.IMPORT_ZIP_MAX_MEMBERS} entries",
+        )
+    members, total = [], 0
+    for info in entries:
+        name = info.filename
+        if info.is_dir() or name.startswith("__MACOSX/") or not name.endswith((".xlsx", ".xls")):
+            continue
+        if info.file_size > settings.IMPORT_ZIP_MAX_MEMBER_BYTES:
+            raise HTTPException(status_code=400, detail=f"'{name}' is too large once extracted")
+        if info.file_size > settings.IMPORT_ZIP_MAX_RATIO * max(info.compress_size, 1):
+            raise HTTPException(status_code=400, detail=f"'{name}' is compressed suspiciously well")
+        total += info.file_size
+        members.append(info)
+    if total > settings.IMPORT_ZIP_MAX_TOTAL_BYTES:
+        raise HTTPException(status_code=400, detail="The zip archive is too large once extracted")
+    return members
+
+
+def list_quiz_sources(file, filename: str, workdir: str) -> list[tuple[str, str, str]]:
+    """
+    Split an upload (a binary file object) into (workbook path, workbook name,
+    sheet name) units, one per quiz. Accepts a multi-sheet workbook or a zip of
+    workbooks. Each workbook is written once into `workdir` (owned by the
+    caller), so pool workers open it by path instead of receiving its bytes.
+    Blocking: call it from a worker thread.
+    """
+    file.seek(0)
+    workbooks: list[tuple[str, str]] = []
+    if filename.endswith(".zip"):
+        try:
+            with zipfile.ZipFile(file) as archive:
+                for number, info in enumerate(_zip_workbooks(archive)):
+                    path = os.path.join(workdir, f"workbook_{number}{os.path.splitext(info.filename)[1]}")
+                    # Streamed in chunks; the member reader stops at the size checked above
+                    with archive.open(info) as source, open(path, "wb") as out:
+                        shutil.copyfileobj(source, out)
+                    workbooks.append((path, info.filename))
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Invalid zip archive")
+        if not workbooks:
+            raise HTTPException(status_code=400, detail="The zip archive contains no Excel files")
+    else:
+        path = os.path.join(workdir, f"workbook_0{os.path.splitext(filename)[1]}")
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file, out)
+        workbooks.append((path, filename))
+
+    sources = []
+    for path, name in workbooks:
+        try:
+            sheets = _sheet_names(path, name)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not read workbook '{name}': {e}")
+        sources.extend((path, name, sheet) for sheet in sheets)
+    return sources
+
+
+def parse_quiz_source(path: str, filename: str, sheet_name: str) -> dict:
+    """
+    Process-pool entry point: validate then parse one sheet, never raise
+    (errors are reported per quiz, with the row report of invalid sheets).
+    """
+    source = f"{filename}:{sheet_name}"
+    try:
+        with open(path, "rb") as f:
+            report = validate_quiz_file(f, filename, sheet_name)
+            if not report["valid"]:
+                return {
+                    "source": source,
+                    "error": f"Sheet has {report['error_count']} errors",
+                    "errors": report["errors"],
+                }
+            return {"source": source, "quiz": parse_quiz_file(f, filename, sheet_name)}
+    except HTTPException as e:
+        return {"source": source, "error": e.detail}
+    except Exception as e:
+        return {"source": source, "error": f"Could not parse sheet: {e}"}
+
+
+async def parse_quiz_sources(sources: list[tuple[str, str, str]]) -> list[dict]:
+    """Parse every sheet in parallel in the import process pool (tasks carry paths, not bytes)."""
+    loop = asyncio.get_running_loop()
+    pool = get_import_pool()
+    return await asyncio.gather(*(
+        loop.run_in_executor(pool, parse_quiz_source, path, name, sheet)
+        for path, name, sheet in sources
+    ))
+
+
+async def bulk_insert_quiz(session: AsyncSession, parsed: dict) -> Quiz:
+    """
+    Insert a parsed quiz with multi-row INSERT ... RETURNING statements.
+    Does not commit: the caller owns the transaction.
+    """
+    quiz = Quiz(
+        title=parsed["title"],
+        description=parsed["description"],
+        total_time=parsed["total_time"],
+        max_attempts=parsed["max_attempts"],
+    )
+    session.add(quiz)
+    await session.flush()
+
+    questions = parsed["questions"]
+    if not questions:
+        return quiz
+
+    result = await session.execute(
+        insert(Question).returning(Question.id, sort_by_parameter_order=True),
+        [{"quiz_id": quiz.id, "text": q["text"], "marks": q["marks"]} for q in questions],
+    )
+    question_ids = result.scalars().all()
+
+    option_rows = [
+        {"question_id": question_id, "text": text, "is_correct": is_correct}
+        for question_id, q in zip(question_ids, questions)
+        for text, is_correct in q["options"]
+    ]
+    await session.execute(insert(Option), option_rows)
+    return quiz
+
+
+def quiz_import_summary(quiz: Quiz, question_count: int) -> dict:
+    return {
+        "id": quiz.id,
+        "title": quiz.title,
+        "description": quiz.description,
+        "total_time": quiz.total_time,
+        "max_attempts": quiz.max_attempts,
+        "is_active": quiz.is_active,
+        "created_at": str(quiz.created_at),
+        "question_count": question_count,
+    }
@@ -3,7 +3,10 @@ from fastapi import Depends, HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 from app.auth.admin import admin_required, user_required
+from app.auth.principal_cache import clear_principal_cache
+from app.auth.role_registry import load_roles
 from app.db import get_session
+from app.invalidation import publish
 from app.models.user import Role, User
 from app.schemas.user_schema import RoleCreate, RoleUpdate
 from sqlalchemy.exc import SQLAlchemyError
@@ -25,6 +28,7 @@ async def create_auto_roles():
                 session.add(Role(name=name, description=description))
 
         await session.commit()
+    await load_roles()
 
 
 async def get_all_role(session: Annotated[AsyncSession, Depends(get_session)]):
@@ -64,6 +68,8 @@ async def create_role(
         db_role = Role.model_validate(role_data)
         session.add(db_role)
         await session.commit()  
+        await load_roles()
+        publish("roles")
 
         # Reload role with users eagerly loaded
         result = await session.exec(
@@ -111,6 +117,9 @@ async def update_role(
     session.add(db_role)
     await session.commit()
     await session.refresh(db_role)
+    await load_roles()
+    publish("roles")
+    clear_principal_cache()  # cached principals carry the role name
     return {
         "id": db_role.id,
         "name": db_role.name,
@@ -126,6 +135,9 @@ async def delete_role(session:Annotated[AsyncSession,Depends(get_session)],role_
        raise HTTPException(status_code=404, detail="role not found")
    await session.delete(role)
    await session.commit()
+   await load_roles()
+   publish("roles")
+   clear_principal_cache()
    return {
         "id": role.id,
         "name": role.name,
@@ -2,8 +2,10 @@ from typing import Annotated
 from fastapi import Depends, HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
-from app.auth.admin import admin_required, user_required
-from app.auth.utils import get_password_hash
+from app.auth.admin import admin_required, profile_required, user_required
+from app.auth.principal_cache import invalidate_principal
+from app.auth.role_registry import require_role, role_name
+from app.auth.utils import get_password_hash_async
 from app.db import get_session
 from app.models.user import Role, User
 from app.schemas.user_schema import UserCreate, UserUpdate
@@ -44,16 +46,13 @@ async def signup_student(
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # ✅ Find the "student" role
-    result = await session.exec(select(Role).where(Role.name == "student"))
-    student_role = result.one_or_none()
-    if not student_role:
-        raise HTTPException(status_code=404, detail="Role not found")
+    student_role = require_role("student")
 
     # ✅ Create new user
     db_user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
         role_id=student_role.id,
     )
     session.add(db_user)
@@ -66,16 +65,11 @@ async def signup_student(
 
     await session.refresh(db_user)
 
-    # Reload with role
-    stmt = select(User).options(selectinload(User.role)).where(User.id == db_user.id)
-    result = await session.exec(stmt)
-    db_user = result.one()
-
     return {
         "id": db_user.id,
         "username": db_user.username,
         "email": db_user.email,
-        "role": db_user.role.name if db_user.role else None,
+        "role": student_role.name,
         "created_at": db_user.created_at,
         "updated_at": db_user.updated_at,
     }
@@ -111,30 +105,22 @@ async def create_user(
     user: User = Depends(user_required)
 ):
     # find the "student" role
-    result = await session.exec(select(Role).where(Role.name == "student"))
-    student_role = result.one_or_none()
-    if not student_role:
-        raise HTTPException(status_code=404, detail="Role not found")
+    student_role = require_role("student")
 
     db_user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
         role_id=student_role.id
     )
     session.add(db_user)
     await session.commit()
 
-    # reload with role eagerly loaded
-    stmt = select(User).options(selectinload(User.role)).where(User.id == db_user.id)
-    result = await session.exec(stmt)
-    db_user = result.one()
-
     return {
         "id": db_user.id,
         "username": db_user.username,
         "email": db_user.email,
-        "role": db_user.role.name if db_user.role else "student",
+        "role": student_role.name,
         "created_at": db_user.created_at.isoformat() if db_user.created_at else None,
         "updated_at": db_user.updated_at.isoformat() if db_user.updated_at else None,
     }
@@ -158,7 +144,7 @@ async def update_user(
     user_data = data.model_dump(exclude_unset=True)
 
     if "password" in user_data:
-        db_user.password_hash = get_password_hash(user_data.pop("password"))
+        db_user.password_hash = await get_password_hash_async(user_data.pop("password"))
 
     for key, value in user_data.items():
         setattr(db_user, key, value)
@@ -166,13 +152,14 @@ async def update_user(
     session.add(db_user)
     await session.commit()
     await session.refresh(db_user)
+    invalidate_principal(db_user.id)
     return {
-        "id": str(user.id),
-        "username": user.username,
-        "email": user.email,
-        "role": user.role.name if user.role else "unknown",
-        "created_at": user.created_at.isoformat() if user.created_at else None,
-        "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+        "id": str(db_user.id),
+        "username": db_user.username,
+        "email": db_user.email,
+        "role": db_user.role.name if db_user.role else "unknown",
+        "created_at": db_user.created_at.isoformat() if db_user.created_at else None,
+        "updated_at": db_user.updated_at.isoformat() if db_user.updated_at else None,
     }
 
 async def delete_user(
@@ -193,6 +180,7 @@ async def delete_user(
 
     await session.delete(db_user)
     await session.commit()
+    invalidate_principal(db_user.id)
 
     # return dict to avoid serialization issues
     return {
@@ -208,13 +196,13 @@ async def delete_user(
 async def update_my_profile(
     data: UserUpdate,
     session: Annotated[AsyncSession, Depends(get_session)],
-    user: User = Depends(user_required)
+    user: User = Depends(profile_required)
 ):
     user_data = data.model_dump(exclude_unset=True)
     user_data.pop("role_id", None) 
 
     if "password" in user_data:
-        user.password_hash = get_password_hash(user_data.pop("password"))
+        user.password_hash = await get_password_hash_async(user_data.pop("password"))
 
     for key, value in user_data.items():
         setattr(user, key, value)
@@ -222,12 +210,13 @@ async def update_my_profile(
     session.add(user)
     await session.commit()
     await session.refresh(user)
+    invalidate_principal(user.id)
 
     return {
         "id": str(user.id),
         "username": user.username,
         "email": user.email,
-        "role": user.role.name if user.role else "unknown",
+        "role": await role_name(user.role_id),
         "created_at": user.created_at.isoformat() if user.created_at else None,
         "updated_at": user.updated_at.isoformat() if user.updated_at else None,
     }
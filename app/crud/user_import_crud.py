@@ -0,0 +1,220 @@
+# app/crud/user_import_crud.py
+import asyncio
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Iterator
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.auth.role_registry import get_role
+from app.auth.utils import hash_passwords
+from app.config import settings
+from app.crud.quiz_import_crud import get_import_pool
+from app.models.user import User
+
+# Roster layout: one student per row. "Role" is optional (defaults to student).
+ROSTER_COLUMNS = ["Username", "Email", "Password"]
+ROSTER_DEFAULT_ROLE = "student"
+USER_LOOKUP_CHUNK = 1000
+HASH_CHUNK_SIZE = 50
+
+
+def _iter_roster_rows(data: bytes, filename: str) -> Iterator[tuple]:
+    if filename.endswith(".csv"):
+        yield from csv.reader(io.StringIO(data.decode("utf-8-sig")))
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def parse_roster(data: bytes, filename: str) -> tuple[list[dict], list[dict]]:
+    """
+    Read a CSV/XLSX roster into (rows, errors). Rows are numbered as in the
+    sheet (header = row 1). Blocking: call it from a worker thread.
+    """
+    rows_iter = _iter_roster_rows(data, filename)
+    header = next(rows_iter, None)
+    if header is None:
+        raise HTTPException(status_code=400, detail="The uploaded roster is empty")
+
+    columns = [str(c).strip().lower() if c is not None else "" for c in header]
+    missing_cols = [col for col in ROSTER_COLUMNS if col.lower() not in columns]
+    if missing_cols:
+        raise HTTPException(status_code=400, detail=f"Missing required columns: {missing_cols}")
+    index = {name: columns.index(name) for name in ("username", "email", "password", "role") if name in columns}
+
+    rows, errors = [], []
+    seen_emails: dict[str, int] = {}
+    seen_usernames: dict[str, int] = {}  # exact match, as login looks users up
+    for number, values in enumerate(rows_iter, start=2):
+        cells = {
+            name: str(values[i]).strip() if i < len(values) and values[i] is not None else ""
+            for name, i in index.items()
+        }
+        if not any(cells.values()):
+            continue  # blank row
+
+        problems = [
+            {"row": number, "column": col, "message": "Missing value"}
+            for col in ROSTER_COLUMNS if not cells[col.lower()]
+        ]
+        username = cells["username"]
+        if username in seen_usernames:
+            problems.append({"row": number, "column": "Username", "message": f"Duplicate of row {seen_usernames[username]}"})
+        elif username:
+            seen_usernames[username] = number
+
+        email = cells["email"]
+        if email and "@" not in email:
+            problems.append({"row": number, "column": "Email", "message": "Not an email address"})
+        elif email:
+            key = email.lower()
+            if key in seen_emails:
+                problems.append({"row": number, "column": "Email", "message": f"Duplicate of row {seen_emails[key]}"})
+            else:
+                seen_emails[key] = number
+
+        if problems:
+            errors.extend(problems)
+        else:
+            rows.append({
+                "row": number,
+                "username": username,
+                "email": email,
+                "password": cells["password"],
+                "role": cells.get("role") or ROSTER_DEFAULT_ROLE,
+            })
+    return rows, errors
+
+
+async def _existing_values(session: AsyncSession, column, values: list[str], min_count: int = 1) -> set[str]:
+    """
+    Values of a User column present at least min_count times. One set-based IN
+    query per chunk of values (keeps bind parameters bounded).
+    """
+    existing = set()
+    for start in range(0, len(values), USER_LOOKUP_CHUNK):
+        chunk = values[start:start + USER_LOOKUP_CHUNK]
+        statement = select(column).where(column.in_(chunk))
+        if min_count > 1:
+            statement = statement.group_by(column).having(func.count() >= min_count)
+        result = await session.exec(statement)
+        existing.update(result.all())
+    return existing
+
+
+async def _registered_conflicts(session: AsyncSession, rows: list[dict]) -> list[dict]:
+    """Row errors for emails / usernames that already belong to a user."""
+    emails = await _existing_values(session, User.email, [r["email"] for r in rows])
+    usernames = await _existing_values(session, User.username, [r["username"] for r in rows])
+    errors = []
+    for r in rows:
+        if r["username"] in usernames:
+            errors.append({"row": r["row"], "column": "Username", "message": "Username already taken"})
+        if r["email"] in emails:
+            errors.append({"row": r["row"], "column": "Email", "message": "Email already registered"})
+    return errors
+
+
+async def _hash_roster_passwords(passwords: list[str]) -> list[str]:
+    """bcrypt in the process pool, in chunks, so all cores work on one roster."""
+    loop = asyncio.get_running_loop()
+    pool = get_import_pool()
+    chunks = [passwords[i:i + HASH_CHUNK_SIZE] for i in range(0, len(passwords), HASH_CHUNK_SIZE)]
+    hashed = await asyncio.gather(*(
+        loop.run_in_executor(pool, hash_passwords, chunk, settings.PROVISION_PASSWORD_ROUNDS)
+        for chunk in chunks
+    ))
+    return [h for chunk in hashed for h in chunk]
+
+
+async def provision_users(session: AsyncSession, file: UploadFile, skip_invalid: bool = False) -> dict:
+    """
+    Create every user of a roster in one transaction.
+    Invalid rows (missing values, duplicate or already registered usernames or
+    emails, unknown roles) abort the upload unless skip_invalid is set.
+    """
+    filename = file.filename or ""
+    if not filename.endswith((".csv", ".xlsx")):
+        raise HTTPException(status_code=400, detail="Upload a .csv or .xlsx roster")
+
+    data = await file.read()
+    try:
+        rows, errors = await run_in_threadpool(parse_roster, data, filename)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read roster: {e}")
+
+    conflicts = await _registered_conflicts(session, rows)
+    errors.extend(conflicts)
+    conflicted = {e["row"] for e in conflicts}
+    valid = []
+    for r in rows:
+        if r["row"] in conflicted:
+            continue
+        role = get_role(r["role"])  # role registry: no role query per upload
+        if role is None:
+            errors.append({"row": r["row"], "column": "Role", "message": f"Unknown role '{r['role']}'"})
+        else:
+            valid.append({**r, "role_id": role.id})
+    errors.sort(key=lambda e: e["row"])
+
+    if errors and not skip_invalid:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Roster has invalid rows; nothing was created", "error_count": len(errors), "errors": errors},
+        )
+
+    if valid:
+        hashes = await _hash_roster_passwords([r["password"] for r in valid])
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        conflict = False
+        try:
+            # executemany of a single INSERT: batched into multi-row VALUES by the dialect
+            await session.execute(insert(User), [
+                {
+                    "username": r["username"],
+                    "email": r["email"],
+                    "password_hash": password_hash,
+                    "role_id": r["role_id"],
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for r, password_hash in zip(valid, hashes)
+            ])
+            # Usernames have no unique constraint: look for one taken concurrently
+            conflict = bool(await _existing_values(session, User.username, [r["username"] for r in valid], min_count=2))
+            if not conflict:
+                await session.commit()
+        except IntegrityError:
+            conflict = True
+        if conflict:
+            await session.rollback()
+            conflicts = await _registered_conflicts(session, valid)
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": "Some usernames or emails were registered while provisioning; nothing was created, retry the upload",
+                    "error_count": len(conflicts),
+                    "errors": conflicts,
+                },
+            )
+
+    return {
+        "message": f"Created {len(valid)} users",
+        "created": len(valid),
+        "skipped": len({e["row"] for e in errors}),
+        "error_count": len(errors),
+        "errors": errors,
+    }
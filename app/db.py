@@ -1,14 +1,261 @@
+import logging
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from uuid import uuid4
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import event, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import URL, Dialect, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.config import settings
-from typing import AsyncGenerator
+from typing import AsyncGenerator, AsyncIterator, Iterable
 
-db_url_str = settings.get_db_url()
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(db_url_str, echo=True, future=True)
+_pool_stats = {
+    "checkouts": 0,
+    "checkout_timeouts": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            _pool_stats["checkout_timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            _pool_stats["checkouts"] += 1
+            _pool_stats["wait_seconds_total"] += waited
+            _pool_stats["wait_seconds_max"] = max(_pool_stats["wait_seconds_max"], waited)
+
+
+# Sync / driverless schemes in DATABASE_URL -> the async driver the app runs on
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def database_url(url: str | None = None) -> tuple[URL, dict]:
+    """
+    DATABASE_URL as an async SQLAlchemy URL plus driver connect args (shared
+    with alembic/env.py). libpq's sslmode query parameter becomes asyncpg's ssl.
+    """
+    url = make_url(url or settings.get_db_url())
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    connect_args = {}
+    if url.get_driver_name() == "asyncpg" and "sslmode" in url.query:
+        connect_args["ssl"] = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"])
+    return url, connect_args
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.database in (None, "", ":memory:") or "mode=memory" in str(url)
+
+
+def _sqlite_pragmas(url: URL):
+    """Per-connection SQLite settings, so local runs behave like PostgreSQL where it matters."""
+    wal = not _is_memory_sqlite(url)
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # Off by default in SQLite: without it ondelete=CASCADE / SET NULL never fire
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if wal:
+            # Readers don't block the writer (concurrent requests on a file database)
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+        # The driver's own transaction handling breaks SAVEPOINT (begin_nested);
+        # turn it off and let _sqlite_begin emit BEGIN (SQLAlchemy's documented recipe)
+        dbapi_connection.isolation_level = None
+
+    return on_connect
+
+
+def _sqlite_begin(connection):
+    # On the raw driver cursor, like the BEGIN the driver used to send itself, so
+    # query audits/budgets count the same statements as on PostgreSQL
+    cursor = connection.connection.cursor()
+    cursor.execute("BEGIN")
+    cursor.close()
+
+
+def build_engine(url: str | None = None) -> AsyncEngine:
+    """
+    Create the async engine from settings (DB_* in app/config/settings.py).
+    SQLite gets the driver's default pool (one shared connection for :memory:);
+    DB_POOL_SIZE=0 disables client-side pooling.
+    """
+    url, connect_args = database_url(url)
+    kwargs = {"echo": settings.DB_ECHO, "future": True}
+
+    if url.get_backend_name() != "sqlite":
+        kwargs["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+        if settings.DB_POOL_SIZE <= 0:
+            kwargs["poolclass"] = NullPool
+        else:
+            kwargs.update(
+                poolclass=MeteredQueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+            )
+
+    if url.get_driver_name() == "asyncpg":
+        if settings.DB_PGBOUNCER:
+            # Transaction pooling: a prepared statement may land on another server
+            # connection, so cache nothing and give every statement a unique name
+            url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        else:
+            url = url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+            connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    new_engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+    if url.get_backend_name() == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _sqlite_pragmas(url))
+        event.listen(new_engine.sync_engine, "begin", _sqlite_begin)
+    return new_engine
+
+
+engine = build_engine()
 AsyncSessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+
+def pool_stats() -> dict:
+    """Current pool occupancy plus cumulative checkout wait times."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status(), **_pool_stats}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    return stats
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic", "versions")
+_REVISION_RE = re.compile(r"^revision(?:: str)? = ['\"](\w+)['\"]", re.M)
+_DOWN_REVISION_RE = re.compile(r"^down_revision(?:: [^=]+)? = (.+)$", re.M)
+
+
+def migration_graph() -> tuple[set[str], set[str]]:
+    """
+    (all revisions, head revisions) read straight from the migration files.
+    A regex scan instead of alembic's ScriptDirectory: no imports, a few ms.
+    """
+    revisions, parents = set(), set()
+    for name in os.listdir(MIGRATIONS_DIR):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as f:
+            source = f.read()
+        revision = _REVISION_RE.search(source)
+        if not revision:
+            continue
+        revisions.add(revision.group(1))
+        down = _DOWN_REVISION_RE.search(source)
+        if down:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down.group(1)))
+    return revisions, revisions - parents
+
+
+async def check_schema_revision():
+    """
+    Fast-boot replacement for create_all: make sure `alembic upgrade head` has run.
+    A database *ahead* of this code (unknown revision, e.g. during a rolling
+    deploy after the new release migrated) is allowed with a warning.
+    """
+    revisions, heads = migration_graph()
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = set(result.scalars().all())
+        except Exception:
+            current = set()
+    if current == heads:
+        return
+    if current and not current <= revisions:
+        logger.warning("Database revision %s is newer than this code (%s)", sorted(current), sorted(heads))
+        return
+    raise RuntimeError(
+        f"Database schema is at {sorted(current) or 'no revision'}, this code expects {sorted(heads)}: "
+        "run `alembic upgrade head` (and `python -m app.cli seed` on a new database)"
+    )
+
+
+def upsert(
+    model, values: dict | list[dict], index_elements: Iterable[str], update: Iterable[str] = (), *, dialect: Dialect,
+):
+    """
+    INSERT ... ON CONFLICT (index_elements) DO UPDATE SET <update columns from
+    the new row>, or DO NOTHING when `update` is empty. Same syntax and
+    semantics on PostgreSQL and SQLite (3.24+), built for `dialect`: pass the
+    one of the session that executes it (`session.bind.dialect`).
+    """
+    insert = pg_insert if dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(model).values(values)
+    update = list(update)
+    if not update:
+        return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    return stmt.on_conflict_do_update(
+        index_elements=list(index_elements), set_={column: stmt.excluded[column] for column in update}
+    )
+
+
+def insert_ignore(model, values: dict | list[dict], index_elements: Iterable[str], *, dialect: Dialect):
+    """INSERT that skips rows conflicting on `index_elements` (ON CONFLICT DO NOTHING)."""
+    return upsert(model, values, index_elements, dialect=dialect)
+
+
+@asynccontextmanager
+async def scratch_database(url: str = "sqlite+aiosqlite://") -> AsyncIterator[AsyncEngine]:
+    """
+    Throwaway database with the current schema (create_all, no migrations),
+    in memory by default or at a sqlite file URL, for tests and benchmarks:
+
+        async with scratch_database() as db:
+            async with AsyncSession(db) as session: ...
+
+    The engine is disposed and a file database deleted on exit.
+    """
+    from app.models import job, quiz, user  # noqa: F401  (register every table)
+
+    scratch = build_engine(url)
+    async with scratch.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    try:
+        yield scratch
+    finally:
+        await scratch.dispose()
+        if scratch.url.get_backend_name() == "sqlite" and not _is_memory_sqlite(scratch.url):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(scratch.url.database + suffix):
+                    os.remove(scratch.url.database + suffix)
+
+
 async def create_db_and_tables():
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
@@ -16,4 +263,3 @@ async def create_db_and_tables():
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
-
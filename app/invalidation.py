@@ -0,0 +1,175 @@
+"""
+Cross-worker cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+A mutation evicts its own worker's entries and calls `publish(kind, key)`;
+every other worker receives the event on its listener connection and runs
+the handlers subscribed to that kind. Events are compact JSON:
+
+    {"o": "<host:pid>", "k": "<kind>", "id": <key or null>}
+
+Kinds in use: "principal" (user id, null = all), "roles" and "revoked"
+(access-token jti). Publish a kind only once some cache subscribes to it.
+
+NOTIFY is fire-and-forget: events sent while a worker is disconnected are
+lost, so each (re)connect runs the full-flush handlers. On SQLite (single
+process) the bus is off and the periodic refresh loops remain the fallback.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+from typing import Any, Callable
+from sqlalchemy import text
+from app.config import settings
+from app.db import engine
+
+logger = logging.getLogger(__name__)
+
+# Events carry their origin so a worker skips the ones it published itself
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}"
+MAX_RECONNECT_DELAY = 30.0
+
+_NOTIFY = text("SELECT pg_notify(:channel, :payload)")
+
+_handlers: dict[str, list[Callable]] = {}
+_flush_handlers: list[Callable] = []
+_pending: set[asyncio.Task] = set()
+_stats = {"published": 0, "publish_errors": 0, "received": 0, "handler_errors": 0, "connects": 0, "full_flushes": 0}
+_connected = False
+
+
+def bus_enabled() -> bool:
+    return settings.INVALIDATION_BUS and engine.url.get_backend_name() == "postgresql"
+
+
+def subscribe(kind: str, handler: Callable):
+    """handler(key) runs (sync or async) for every event of `kind` from another worker."""
+    _handlers.setdefault(kind, []).append(handler)
+
+
+def on_full_flush(handler: Callable):
+    """handler() runs whenever the listener (re)connects and events may have been missed."""
+    _flush_handlers.append(handler)
+
+
+async def _call(handler: Callable, *args):
+    result = handler(*args)
+    if inspect.isawaitable(result):
+        await result
+
+
+def publish(kind: str, key: Any = None):
+    """
+    Tell the other workers to evict `kind` entries for `key` (all of them for None).
+    Call it after the commit; evicting this worker's own entries is up to the caller.
+    Sent from a background task, so a slow or failing NOTIFY never fails the request.
+    """
+    if not bus_enabled():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    payload = json.dumps({"o": ORIGIN, "k": kind, "id": key}, separators=(",", ":"))
+    task = loop.create_task(_notify(payload))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def _notify(payload: str):
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(_NOTIFY, {"channel": settings.INVALIDATION_CHANNEL, "payload": payload})
+        _stats["published"] += 1
+    except Exception:
+        _stats["publish_errors"] += 1
+        logger.exception("Invalidation publish failed: %s", payload)
+
+
+async def _dispatch(payload: str):
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        logger.warning("Ignoring malformed invalidation event: %r", payload)
+        return
+    if event.get("o") == ORIGIN:
+        return
+    _stats["received"] += 1
+    for handler in _handlers.get(event.get("k"), ()):
+        try:
+            await _call(handler, event.get("id"))
+        except Exception:
+            _stats["handler_errors"] += 1
+            logger.exception("Invalidation handler failed for %s", payload)
+
+
+async def full_flush():
+    _stats["full_flushes"] += 1
+    for handler in _flush_handlers:
+        try:
+            await _call(handler)
+        except Exception:
+            _stats["handler_errors"] += 1
+            logger.exception("Full-flush handler %s failed", getattr(handler, "__name__", handler))
+
+
+def _listen_dsn() -> str:
+    # A plain asyncpg connection outside the pool: LISTEN needs a session of its own
+    url = engine.url.set(drivername="postgresql").difference_update_query(["prepared_statement_cache_size"])
+    return url.render_as_string(hide_password=False)
+
+
+async def invalidation_listener():
+    """Background task started from lifespan when the bus is enabled."""
+    global _connected
+    import asyncpg
+
+    delay = settings.INVALIDATION_RECONNECT_DELAY
+    while True:
+        queue: asyncio.Queue = asyncio.Queue()
+        conn = None
+        try:
+            conn = await asyncpg.connect(_listen_dsn())
+            conn.add_termination_listener(lambda _conn: queue.put_nowait(None))
+            await conn.add_listener(
+                settings.INVALIDATION_CHANNEL,
+                lambda _conn, _pid, _channel, payload: queue.put_nowait(payload),
+            )
+            _connected = True
+            _stats["connects"] += 1
+            await full_flush()
+            delay = settings.INVALIDATION_RECONNECT_DELAY
+
+            # Events are applied one at a time, in the order they were received
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), settings.INVALIDATION_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Quiet channel: make sure the connection is still alive
+                    await asyncio.wait_for(conn.execute("SELECT 1"), settings.INVALIDATION_HEARTBEAT)
+                    continue
+                if payload is None:
+                    raise ConnectionError("listener connection closed")
+                await _dispatch(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Invalidation listener disconnected, reconnecting in %.1fs", delay, exc_info=True)
+        finally:
+            _connected = False
+            if conn is not None and not conn.is_closed():
+                conn.terminate()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+def invalidation_stats() -> dict:
+    return {
+        **_stats,
+        "enabled": bus_enabled(),
+        "connected": _connected,
+        "channel": settings.INVALIDATION_CHANNEL,
+        "kinds": sorted(_handlers),
+    }
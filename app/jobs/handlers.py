@@ -0,0 +1,65 @@
+# app/jobs/handlers.py
+import io
+import os
+import tempfile
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from app.crud.quiz_crud import import_quiz, import_quizzes
+from app.crud.quiz_export_crud import EXPORT_MEDIA_TYPES, export_filename, export_quizzes_to_file
+from app.db import AsyncSessionLocal
+from app.jobs.storage import load_job_file, save_job_file
+from app.models.job import Job
+
+# Handlers receive the claimed Job and an async `progress(percent, message)`
+# callback, and return the JSON result stored on the job. Raising fails the job.
+# Uploads and produced files live in the jobfile table (see app.jobs.storage);
+# the queue drops the upload once the job has finished for good.
+
+
+async def _job_upload(job: Job) -> UploadFile:
+    upload = await load_job_file(job.id, "upload")
+    if upload is None:
+        raise RuntimeError("The job's upload is no longer available")
+    return UploadFile(io.BytesIO(upload.data), filename=upload.filename)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def handle_quiz_import(job: Job, progress) -> dict:
+    upload = await _job_upload(job)
+    await progress(10, "Parsing sheet")
+    async with AsyncSessionLocal() as session:
+        return await import_quiz(session, None, upload)
+
+
+async def handle_quiz_import_batch(job: Job, progress) -> dict:
+    async def report(done: int, total: int):
+        await progress(int(100 * done / total) if total else 100, f"Imported {done} of {total} quizzes")
+
+    upload = await _job_upload(job)
+    async with AsyncSessionLocal() as session:
+        return await import_quizzes(session, None, upload, progress=report)
+
+
+async def handle_quiz_export(job: Job, progress) -> dict:
+    payload = job.payload
+    quiz_ids, format = payload["quiz_ids"], payload["format"]
+    filename, media_type = export_filename(quiz_ids, format), EXPORT_MEDIA_TYPES[format]
+    await progress(10, "Exporting")
+    with tempfile.TemporaryDirectory(prefix="quiz_export_") as workdir:
+        path = await export_quizzes_to_file(quiz_ids, format, os.path.join(workdir, filename))
+        data = await run_in_threadpool(_read_file, path)
+    await progress(90, "Saving export")
+    await save_job_file(job.id, "result", filename, data, media_type)
+    return {"filename": filename, "media_type": media_type, "size": len(data)}
+
+
+# job type -> (handler, max concurrent jobs of that type per worker process)
+JOB_HANDLERS = {
+    "quiz_import": (handle_quiz_import, 2),
+    "quiz_import_batch": (handle_quiz_import_batch, 1),
+    "quiz_export": (handle_quiz_export, 2),
+}
@@ -0,0 +1,328 @@
+# app/jobs/queue.py
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, or_, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.jobs.handlers import JOB_HANDLERS
+from app.jobs.storage import add_job_file, delete_job_files
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# In-process worker state
+_workers: list[asyncio.Task] = []
+_running: dict[str, int] = defaultdict(int)   # job type -> jobs running in this process
+_claimed: dict[int, int] = {}                  # job id -> attempt this process claimed
+_claim_lock = asyncio.Lock()
+_wakeup = asyncio.Event()
+_job_stats = {"succeeded": 0, "failed": 0, "claims_lost": 0, "heartbeat_errors": 0, "run_seconds_total": 0.0}
+
+
+def serialize_job(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "type": job.type,
+        "status": job.status,
+        "progress": job.progress,
+        "progress_message": job.progress_message,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_by": job.created_by,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "has_result": job.status == "succeeded" and job.result is not None,
+    }
+
+
+async def enqueue_job(
+    session: AsyncSession,
+    job_type: str,
+    payload: dict,
+    user_id: Optional[int] = None,
+    upload: Optional[tuple[str, bytes]] = None,
+) -> Job:
+    """Queue a job; `upload` (filename, bytes) is stored with it in the same transaction."""
+    if job_type not in JOB_HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job type: {job_type}")
+    job = Job(type=job_type, payload=payload, created_by=user_id)
+    session.add(job)
+    if upload is not None:
+        await session.flush()
+        add_job_file(session, job.id, "upload", *upload)
+    await session.commit()
+    await session.refresh(job)
+    _wakeup.set()
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: int) -> Job:
+    job = await session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+async def list_jobs(session: AsyncSession, status: Optional[str] = None, limit: int = 50) -> list[Job]:
+    stmt = select(Job).order_by(Job.id.desc()).limit(limit)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    result = await session.exec(stmt)
+    return result.all()
+
+
+# ===============================
+# Worker pool
+# ===============================
+async def _claim_job() -> Optional[Job]:
+    """
+    Claim the oldest runnable job whose type still has a free slot in this process.
+    Stale "running" jobs (no heartbeat, e.g. the worker died) are reclaimed too.
+    """
+    async with _claim_lock:
+        free_types = [t for t, (_, limit) in JOB_HANDLERS.items() if _running[t] < limit]
+        if not free_types:
+            return None
+
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.JOB_STALE_SECONDS)
+        async with AsyncSessionLocal() as session:
+            result = await session.exec(
+                select(Job)
+                .where(
+                    Job.type.in_(free_types),
+                    or_(
+                        Job.status == "queued",
+                        and_(Job.status == "running", Job.heartbeat_at < stale_before),
+                    ),
+                )
+                .order_by(Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = result.first()
+            if not job:
+                return None
+
+            if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+                job.status = "failed"
+                job.error = "Gave up after the worker running it stopped responding"
+                job.finished_at = now
+                session.add(job)
+                await delete_job_files(session, [job.id], "upload")
+                await session.commit()
+                return None
+
+            job.status = "running"
+            job.attempts += 1
+            job.started_at = now
+            job.heartbeat_at = now
+            session.add(job)
+            await session.commit()
+
+        _running[job.type] += 1
+        _claimed[job.id] = job.attempts
+        return job
+
+
+class ClaimLost(Exception):
+    """The job was reclaimed by another worker (this one looked dead); stop working on it."""
+
+
+def _owned(job: Job):
+    # The attempt counter is the claim token: reclaiming a stale job bumps it
+    return and_(Job.id == job.id, Job.attempts == job.attempts, Job.status == "running")
+
+
+async def _update_job(job: Job, **values) -> bool:
+    """Update a job this worker still owns; False when another worker has reclaimed it."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(update(Job).where(_owned(job)).values(**values))
+        await session.commit()
+    return result.rowcount > 0
+
+
+async def _delete_job_upload(job_id: int):
+    """The upload is only needed until the job has finished for good."""
+    async with AsyncSessionLocal() as session:
+        await delete_job_files(session, [job_id], "upload")
+        await session.commit()
+
+
+async def _heartbeat(job: Job, work: asyncio.Task):
+    """Keep the claim fresh; cancel `work` as soon as the claim turns out to be lost."""
+    while True:
+        await asyncio.sleep(max(settings.JOB_STALE_SECONDS / 3, 1))
+        try:
+            owned = await _update_job(job, heartbeat_at=datetime.utcnow())
+        except Exception:
+            # Transient: the next beat retries well before JOB_STALE_SECONDS runs out
+            _job_stats["heartbeat_errors"] += 1
+            logger.exception("Heartbeat for job %s failed", job.id)
+            continue
+        if not owned:
+            work.cancel()
+            return
+
+
+async def _run_job(job: Job):
+    handler, _ = JOB_HANDLERS[job.type]
+
+    async def progress(percent: int, message: Optional[str] = None):
+        owned = await _update_job(
+            job,
+            progress=max(0, min(100, int(percent))),
+            progress_message=message,
+            heartbeat_at=datetime.utcnow(),
+        )
+        if not owned:
+            raise ClaimLost()
+
+    work = asyncio.create_task(handler(job, progress))
+    heartbeat = asyncio.create_task(_heartbeat(job, work))
+    started = time.perf_counter()
+    try:
+        try:
+            result = await work
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # Shutdown. Still listed in _claimed: stop_job_workers() puts it back in the queue
+                raise
+            raise ClaimLost()  # cancelled by the heartbeat
+        except ClaimLost:
+            raise
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.type)
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            if not await _update_job(job, status="failed", error=str(detail), finished_at=datetime.utcnow()):
+                raise ClaimLost()
+            _job_stats["failed"] += 1
+        else:
+            finished = await _update_job(
+                job,
+                status="succeeded",
+                result=result,
+                progress=100,
+                progress_message="Done",
+                finished_at=datetime.utcnow(),
+            )
+            if not finished:
+                raise ClaimLost()
+            _job_stats["succeeded"] += 1
+        _claimed.pop(job.id, None)
+        await _delete_job_upload(job.id)
+    except ClaimLost:
+        # The new owner runs it (and needs its upload); leave the row alone
+        logger.warning("Job %s (%s) was reclaimed by another worker; stopped it here", job.id, job.type)
+        _claimed.pop(job.id, None)
+        _job_stats["claims_lost"] += 1
+    finally:
+        heartbeat.cancel()
+        work.cancel()
+        _running[job.type] -= 1
+        _job_stats["run_seconds_total"] += time.perf_counter() - started
+
+
+async def _worker_loop(worker_id: int):
+    while True:
+        try:
+            job = await _claim_job()
+        except Exception:
+            logger.exception("Job worker %s could not claim a job", worker_id)
+            job = None
+
+        if job is None:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await _run_job(job)
+        except Exception:
+            # e.g. the final status write failed: the job goes stale and is reclaimed
+            logger.exception("Job worker %s could not record job %s", worker_id, job.id)
+
+
+def start_job_workers():
+    for worker_id in range(settings.JOB_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop(worker_id)))
+
+
+async def stop_job_workers():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+    # Hand interrupted jobs back to the queue so another worker (or the next boot) resumes them
+    if _claimed:
+        await _requeue_claimed(dict(_claimed))
+        _claimed.clear()
+
+
+async def purge_finished_jobs(batch_size: int = settings.JOB_PURGE_BATCH) -> int:
+    """Delete jobs finished more than JOB_RETENTION_DAYS ago, with their files; returns jobs deleted."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.JOB_RETENTION_DAYS)
+    deleted = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await session.exec(
+                select(Job.id)
+                .where(Job.status.in_(("succeeded", "failed")), Job.finished_at < cutoff)
+                .order_by(Job.id)
+                .limit(batch_size)
+            )
+            job_ids = result.all()
+            if not job_ids:
+                return deleted
+            await delete_job_files(session, job_ids)
+            await session.execute(delete(Job).where(Job.id.in_(job_ids)))
+            await session.commit()
+        deleted += len(job_ids)
+        if len(job_ids) < batch_size:
+            return deleted
+
+
+async def job_purge_loop():
+    """Periodic retention purge started from lifespan."""
+    while True:
+        await asyncio.sleep(settings.JOB_PURGE_INTERVAL)
+        try:
+            deleted = await purge_finished_jobs()
+            if deleted:
+                logger.info("Purged %s finished jobs", deleted)
+        except Exception:
+            logger.exception("Job purge failed")
+
+
+def job_worker_stats() -> dict:
+    """Workers and jobs of this process (the queue itself lives in the job table)."""
+    return {
+        **_job_stats,
+        "workers": len(_workers),
+        "running": {job_type: n for job_type, n in _running.items() if n},
+    }
+
+
+async def _requeue_claimed(claims: dict[int, int]):
+    """Queue the given (job id -> claimed attempt) jobs again, unless reclaimed meanwhile."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(Job)
+            .where(Job.status == "running", or_(*(
+                and_(Job.id == job_id, Job.attempts == attempt) for job_id, attempt in claims.items()
+            )))
+            .values(status="queued", heartbeat_at=None)
+        )
+        await session.commit()
@@ -0,0 +1,52 @@
+# app/jobs/storage.py
+from typing import Optional
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.models.job import JobFile
+
+# Job files live in the jobfile table rather than on local disk: a job may be
+# claimed by any worker process or host, and must survive restarts.
+
+
+async def read_job_upload(file: UploadFile) -> bytes:
+    """Read an upload destined for a job, refusing anything over JOB_FILE_MAX_BYTES."""
+    data = await file.read(settings.JOB_FILE_MAX_BYTES + 1)
+    if len(data) > settings.JOB_FILE_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Upload exceeds {settings.JOB_FILE_MAX_BYTES} bytes",
+        )
+    return data
+
+
+def add_job_file(
+    session: AsyncSession, job_id: int, kind: str, filename: str, data: bytes, media_type: Optional[str] = None,
+):
+    """Stage a job file on `session`; the caller commits."""
+    session.add(JobFile(job_id=job_id, kind=kind, filename=filename, media_type=media_type, size=len(data), data=data))
+
+
+async def save_job_file(job_id: int, kind: str, filename: str, data: bytes, media_type: Optional[str] = None):
+    """Store (or replace) a job's file of `kind` in its own transaction."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(JobFile).where(JobFile.job_id == job_id, JobFile.kind == kind))
+        add_job_file(session, job_id, kind, filename, data, media_type)
+        await session.commit()
+
+
+async def load_job_file(job_id: int, kind: str) -> Optional[JobFile]:
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(select(JobFile).where(JobFile.job_id == job_id, JobFile.kind == kind))
+        return result.first()
+
+
+async def delete_job_files(session: AsyncSession, job_ids: list[int], kind: Optional[str] = None):
+    """Delete the files of the given jobs (all kinds by default); the caller commits."""
+    statement = delete(JobFile).where(JobFile.job_id.in_(job_ids))
+    if kind is not None:
+        statement = statement.where(JobFile.kind == kind)
+    await session.execute(statement)
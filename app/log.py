@@ -0,0 +1,148 @@
+"""
+Logging setup: records are formatted and written by a background thread.
+
+The event loop only puts records on a bounded queue (QueueHandler); a
+QueueListener thread formats and writes them to stdout, as JSON lines
+(LOG_FORMAT=json) or plain text. Every record carries the id of the request
+it was logged from (X-Request-ID, generated when the client sends none).
+
+High-volume events are logged with extra={"sampled": True} and kept with
+probability LOG_SAMPLE_RATE; warnings and errors are never sampled out.
+"""
+import contextvars
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from app.config import settings
+
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id", "sampled", "taskName",
+}
+
+_listener: Optional[QueueListener] = None
+_replaced_handlers: list[logging.Handler] = []
+_stats = {"dropped_queue_full": 0, "sampled_out": 0}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the request id and applies sampling, in the logging caller's context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False) and record.levelno < logging.WARNING:
+            if random.random() >= settings.LOG_SAMPLE_RATE:
+                _stats["sampled_out"] += 1
+                return False
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: when the writer thread falls behind, records are dropped and counted."""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats["dropped_queue_full"] += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        entry.update((k, v) for k, v in vars(record).items() if k not in _RECORD_FIELDS)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging():
+    """Route the root logger through the queue (start of lifespan). Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    handler.addFilter(RequestContextFilter())
+
+    # LOG_LEVEL applies to the app; libraries stay at INFO or above (aiosqlite/asyncio debug is noise)
+    level = logging.getLevelName(settings.LOG_LEVEL.upper())
+    logging.getLogger("app").setLevel(level)
+    root = logging.getLogger()
+    root.setLevel(max(level, logging.INFO))
+    _replaced_handlers[:] = root.handlers
+    for existing in _replaced_handlers:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+
+    _listener = QueueListener(handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush what is queued, stop the writer thread and give the root logger its handlers back (end of lifespan)."""
+    global _listener
+    if _listener is not None:
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            if isinstance(handler, DroppingQueueHandler):
+                root.removeHandler(handler)
+        for handler in _replaced_handlers:
+            root.addHandler(handler)
+        _replaced_handlers.clear()
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> dict:
+    return {**_stats, "level": settings.LOG_LEVEL.upper(), "sample_rate": settings.LOG_SAMPLE_RATE}
+
+
+class RequestIdMiddleware:
+    """Reuses the caller's X-Request-ID (or makes one), exposes it to log records and echoes it back."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
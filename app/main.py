@@ -1,12 +1,27 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.auth.admin import create_admin
+from app.auth.rate_limit import rate_limit_purge_loop
+from app.auth.revocation import rebuild_revocation_filter, revocation_sync_loop
+from app.auth.role_registry import load_roles, role_registry_refresh_loop
+from app.auth.utils import refresh_token_purge_loop
+from app.config import settings
+from app.crud.quiz_import_crud import shutdown_import_pool
 from app.crud.role_crud import create_auto_roles
-from app.db import create_db_and_tables
+from app.db import check_schema_revision, create_db_and_tables, engine
+from app.invalidation import bus_enabled, invalidation_listener
+from app.jobs.queue import job_purge_loop, start_job_workers, stop_job_workers
+from app.log import RequestIdMiddleware, setup_logging, stop_logging
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.query_audit import QueryAuditMiddleware, audit_engine
 from app.routers.question_router import question_router
 from app.routers.quiz_answer_router import quiz_answer_router
 from app.routers.quiz_attempt_router import quiz_attempt_router
 from app.routers.quiz_result_router import quiz_result_router
+from app.routers.job_router import job_router
+from app.routers.metrics_router import metrics_router
 from app.routers.quiz_router import quiz_router
 from app.routers.option_router import option_router
 from app.routers.role_router import role_router
@@ -17,14 +32,50 @@ from fastapi.middleware.cors import CORSMiddleware
 
 # origins = ["https://quiz-app-black-kappa.vercel.app"]
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Creating tables..")
-    await create_db_and_tables()
-    await create_auto_roles()
-    await create_admin()
-    yield
+    # Here rather than at import: importing app.main (CLI, benchmarks) must not
+    # start the writer thread or replace the root handlers
+    setup_logging()
+    try:
+        if settings.FAST_BOOT:
+            await check_schema_revision()
+            await load_roles()
+        else:
+            logger.info("Creating tables..")
+            await create_db_and_tables()
+            await create_auto_roles()
+            await create_admin()
+        await rebuild_revocation_filter()
+    except BaseException:
+        stop_logging()
+        raise
+    start_job_workers()
+    background = [
+        asyncio.create_task(refresh_token_purge_loop()),
+        asyncio.create_task(revocation_sync_loop()),
+        asyncio.create_task(role_registry_refresh_loop()),
+        asyncio.create_task(job_purge_loop()),
+    ]
+    if settings.RATE_LIMIT_SHARED:
+        background.append(asyncio.create_task(rate_limit_purge_loop()))
+    if bus_enabled():
+        background.append(asyncio.create_task(invalidation_listener()))
+    try:
+        yield
+    finally:
+        # Also runs when the app (or an in-process run) fails, so no loop or worker outlives it
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        try:
+            await stop_job_workers()
+        finally:
+            shutdown_import_pool()
+            stop_logging()
 
 
     
@@ -38,6 +89,23 @@ app.include_router(option_router)
 app.include_router(quiz_answer_router)
 app.include_router(quiz_attempt_router)
 app.include_router(quiz_result_router)
+app.include_router(job_router)
+
+if settings.METRICS_ENABLED:
+    # Pool, job, limiter and revocation internals: never served without a token
+    if settings.METRICS_TOKEN:
+        app.include_router(metrics_router)
+    else:
+        logger.warning("METRICS_TOKEN is not set; /metrics is not served")
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+
+# Statement counting is always hooked up (cheap when no audit is open) so
+# assert_max_queries() works; the per-request headers are opt-in
+audit_engine(engine)
+if settings.QUERY_AUDIT:
+    app.add_middleware(QueryAuditMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,290 @@
+"""
+Prometheus metrics for this worker, in the text exposition format.
+
+- MetricsMiddleware: per-route request latency, in-flight requests, status counts
+- instrument_engine(): per-route query counts / durations from engine events
+- collectors: pool, cache, rate-limit, job and invalidation stats read at scrape time
+
+Routes are labelled with their path template ("/quiz/{quiz_id}"), so label
+cardinality stays at the number of routes. Each worker exposes its own
+numbers; Prometheus aggregates across workers.
+"""
+import contextvars
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+UNMATCHED_ROUTE = "<unmatched>"
+BACKGROUND_ROUTE = "<background>"
+
+_registry: list["_Metric"] = []
+_collectors: list[Callable[[], Iterable[tuple]]] = []
+
+# ASGI scope of the request being served (None in background tasks)
+_current_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("metrics_scope", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labels: dict, value: float) -> str:
+    if labels:
+        pairs = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+        return f"{name}{{{pairs}}} {value!r}"
+    return f"{name} {value!r}"
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, object] = {}
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, value in list(self._values.items()):
+            lines.append(_format(self.name, self._labels(key), float(value)))
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            # [per-bucket counts (last one is +Inf), sum]
+            entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, (counts, total) in list(self._values.items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(_format(f"{self.name}_bucket", {**labels, "le": str(bound)}, float(cumulative)))
+            lines.append(_format(f"{self.name}_sum", labels, total))
+            lines.append(_format(f"{self.name}_count", labels, float(cumulative)))
+        return lines
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served", ("method",))
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed, by route", ("route",))
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time, by route", ("route",), buckets=QUERY_BUCKETS
+)
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "SQL statements that raised, by route", ("route",))
+
+
+def route_template(scope: dict) -> str:
+    """Path template of the matched route (set in the scope by the router)."""
+    return getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+def current_route() -> str:
+    scope = _current_scope.get()
+    return BACKGROUND_ROUTE if scope is None else route_template(scope)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no per-request task or body buffering like BaseHTTPMiddleware)."""
+
+    def __init__(self, app, skip_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = _current_scope.set(scope)
+        HTTP_IN_PROGRESS.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = current_route()  # the router has filled in scope["route"] by now
+            HTTP_IN_PROGRESS.dec(method=method)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status_code)
+            HTTP_DURATION.observe(elapsed, method=method, route=route)
+            _current_scope.reset(token)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Time every statement and attribute it to the route being served."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        route = current_route()
+        DB_QUERIES.inc(route=route)
+        DB_QUERY_DURATION.observe(elapsed, route=route)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_started"):
+            conn.info["metrics_started"].pop()
+        DB_QUERY_ERRORS.inc(route=current_route())
+
+
+def register_collector(collect: Callable[[], Iterable[tuple]]):
+    """collect() yields (name, type, help, labels, value) samples at scrape time."""
+    _collectors.append(collect)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+
+    families: dict[str, tuple[str, str, list]] = {}
+    for collect in _collectors:
+        try:
+            for name, metric_type, documentation, labels, value in collect():
+                families.setdefault(name, (metric_type, documentation, []))[2].append((labels, value))
+        except Exception:
+            logger.exception("Metrics collector %s failed", getattr(collect, "__name__", collect))
+    for name, (metric_type, documentation, samples) in families.items():
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(_format(name, labels, float(value)) for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def _collect_app_stats():
+    # Imported here: these modules pull in the engine, models and auth stack
+    from app.admission import admission_stats
+    from app.auth.principal_cache import principal_cache_stats
+    from app.auth.rate_limit import rate_limit_stats
+    from app.auth.revocation import revocation_stats
+    from app.auth.utils import password_hash_stats
+    from app.db import pool_stats
+    from app.invalidation import invalidation_stats
+    from app.jobs.queue import job_worker_stats
+    from app.log import logging_stats
+
+    pool = pool_stats()
+    for field in ("size", "checked_out", "checked_in", "overflow"):
+        if field in pool:
+            yield f"db_pool_{field}", "gauge", f"Connection pool {field.replace('_', ' ')}", {}, pool[field]
+    yield "db_pool_checkouts_total", "counter", "Pool checkouts", {}, pool["checkouts"]
+    yield "db_pool_checkout_timeouts_total", "counter", "Pool checkouts that timed out", {}, pool["checkout_timeouts"]
+    yield "db_pool_wait_seconds_total", "counter", "Time spent waiting for a pooled connection", {}, pool["wait_seconds_total"]
+    yield "db_pool_wait_seconds_max", "gauge", "Longest wait for a pooled connection", {}, pool["wait_seconds_max"]
+
+    principals = principal_cache_stats()
+    yield "principal_cache_entries", "gauge", "Cached principals", {}, principals["size"]
+
+    revocation = revocation_stats()
+    yield "revocation_filter_entries", "gauge", "Revoked token ids in the Bloom filter", {}, revocation["entries"]
+    for field in ("checks", "filter_hits", "confirmed", "syncs", "rebuilds"):
+        yield f"revocation_{field}_total", "counter", f"Revocation filter {field.replace('_', ' ')}", {}, revocation[field]
+
+    for limiter, stats in rate_limit_stats().items():
+        if not isinstance(stats, dict):
+            continue
+        for outcome in ("allowed", "throttled"):
+            yield "rate_limit_decisions_total", "counter", "Rate limiter decisions", \
+                {"limiter": limiter, "outcome": outcome}, stats[outcome]
+        yield "rate_limit_tracked_keys", "gauge", "Keys tracked by a rate limiter", {"limiter": limiter}, stats["tracked_keys"]
+
+    hashing = password_hash_stats()
+    yield "password_hash_waiting", "gauge", "Password hash calls waiting for a slot", {}, hashing["waiting"]
+    yield "password_hash_running", "gauge", "Password hash calls running", {}, hashing["running"]
+    yield "password_hash_completed_total", "counter", "Password hash calls completed", {}, hashing["completed"]
+    yield "password_hash_seconds_total", "counter", "Time spent hashing passwords", {}, hashing["hash_seconds_total"]
+
+    jobs = job_worker_stats()
+    yield "job_workers", "gauge", "Background job workers in this process", {}, jobs["workers"]
+    for outcome in ("succeeded", "failed"):
+        yield "jobs_finished_total", "counter", "Background jobs finished", {"outcome": outcome}, jobs[outcome]
+    yield "job_run_seconds_total", "counter", "Time spent running background jobs", {}, jobs["run_seconds_total"]
+    for job_type, running in jobs["running"].items():
+        yield "jobs_running", "gauge", "Background jobs running", {"type": job_type}, running
+
+    logs = logging_stats()
+    yield "log_records_dropped_total", "counter", "Log records dropped (queue full)", {}, logs["dropped_queue_full"]
+    yield "log_records_sampled_out_total", "counter", "Log records dropped by sampling", {}, logs["sampled_out"]
+
+    for gate, stats in admission_stats().items():
+        if not isinstance(stats, dict):
+            continue
+        yield "admission_running", "gauge", "Requests holding an admission slot", {"gate": gate}, stats["running"]
+        yield "admission_waiting", "gauge", "Requests queued for an admission slot", {"gate": gate}, stats["waiting"]
+        yield "admission_admitted_total", "counter", "Requests admitted", {"gate": gate}, stats["admitted"]
+        for reason in ("queue_full", "timeout"):
+            yield "admission_rejected_total", "counter", "Requests rejected with 503", \
+                {"gate": gate, "reason": reason}, stats[f"rejected_{reason}"]
+
+    bus = invalidation_stats()
+    yield "invalidation_bus_connected", "gauge", "Invalidation listener connected", {}, int(bus["connected"])
+    for field in ("published", "received", "publish_errors", "handler_errors", "full_flushes"):
+        yield f"invalidation_{field}_total", "counter", f"Invalidation events {field.replace('_', ' ')}", {}, bus[field]
+
+
+register_collector(_collect_app_stats)
@@ -0,0 +1,46 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import JSON, Column, Integer, ForeignKey, LargeBinary
+from datetime import datetime, timezone
+
+
+# ===============================
+# Job Table (background admin work)
+# ===============================
+class Job(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    type: str = Field(index=True)                     # e.g. "quiz_import", "quiz_export"
+    status: str = Field(default="queued", index=True)  # queued | running | succeeded | failed
+    payload: Optional[dict] = Field(sa_column=Column(JSON), default=None)
+    result: Optional[dict] = Field(sa_column=Column(JSON), default=None)
+    error: Optional[str] = None
+    progress: int = 0                                  # 0-100
+    progress_message: Optional[str] = None
+    attempts: int = 0
+    created_by: Optional[int] = Field(
+        sa_column=Column(Integer, ForeignKey("user.id", ondelete="SET NULL"))
+    )
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None            # refreshed while running, used to reclaim dead jobs
+
+
+# ===============================
+# JobFile Table (job upload / result bytes)
+# ===============================
+class JobFile(SQLModel, table=True):
+    """
+    A job's upload or produced file, kept in the database next to the job so
+    any worker process or host that claims the job can read it.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("job.id", ondelete="CASCADE"), nullable=False, index=True)
+    )
+    kind: str                                          # upload | result
+    filename: str
+    media_type: Optional[str] = None
+    size: int = 0
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
@@ -1,6 +1,6 @@
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import JSON, Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import JSON, Column, Index, Integer, ForeignKey, UniqueConstraint, text
 from datetime import datetime, timezone
 
 # ===============================
@@ -32,7 +32,7 @@ class Quiz(SQLModel, table=True):
 # ===============================
 class Question(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    quiz_id: int = Field(sa_column=Column(Integer, ForeignKey("quiz.id", ondelete="CASCADE")))
+    quiz_id: int = Field(sa_column=Column(Integer, ForeignKey("quiz.id", ondelete="CASCADE"), index=True))
     text: str
     marks: int = 1
 
@@ -49,7 +49,7 @@ class Question(SQLModel, table=True):
 # ===============================
 class Option(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    question_id: int = Field(sa_column=Column(Integer, ForeignKey("question.id", ondelete="CASCADE")))
+    question_id: int = Field(sa_column=Column(Integer, ForeignKey("question.id", ondelete="CASCADE"), index=True))
     text: str
     is_correct: bool = False
 
@@ -63,6 +63,14 @@ class Option(SQLModel, table=True):
 class QuizAttempt(SQLModel, table=True):
     __table_args__ = (
         UniqueConstraint("quiz_id", "user_id", "attempt_number", name="uq_attempt_number"),
+        # A user's attempts at a quiz, open (submitted_at IS NULL) ones first in the index
+        Index("ix_quizattempt_user_quiz_submitted", "user_id", "quiz_id", "submitted_at"),
+        # Only open attempts have a live deadline; keeps the index small
+        Index(
+            "ix_quizattempt_open_deadline", "deadline",
+            postgresql_where=text("submitted_at IS NULL"),
+            sqlite_where=text("submitted_at IS NULL"),
+        ),
     )
     id: Optional[int] = Field(default=None, primary_key=True)
     quiz_id: int = Field(sa_column=Column(Integer, ForeignKey("quiz.id", ondelete="CASCADE")))
@@ -86,7 +94,7 @@ class QuizAttempt(SQLModel, table=True):
 # ===============================
 class QuizAnswer(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    attempt_id: int = Field(sa_column=Column(Integer, ForeignKey("quizattempt.id", ondelete="CASCADE")))
+    attempt_id: int = Field(sa_column=Column(Integer, ForeignKey("quizattempt.id", ondelete="CASCADE"), index=True))
     question_id: int = Field(sa_column=Column(Integer, ForeignKey("question.id", ondelete="CASCADE")))
     selected_option_id: Optional[int] = Field(sa_column=Column(Integer, ForeignKey("option.id", ondelete="SET NULL")))
 
@@ -104,7 +112,7 @@ class QuizResult(SQLModel, table=True):
     )
     score: int
     max_score: int
-    graded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    graded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None), index=True)
 
     # Relationships
     attempt: "QuizAttempt" = Relationship(back_populates="result")
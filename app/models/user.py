@@ -12,10 +12,13 @@ class LogoutRequest(BaseModel):
 class RefreshToken(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(
-        sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"))
+        sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), index=True)
     )
-    token: str = Field(..., description="The refresh token JWT")
-    expires_at: datetime = Field(..., description="When this token expires")
+    token_hash: str = Field(
+        ..., max_length=64, unique=True, index=True,
+        description="SHA-256 hex digest of the refresh token JWT (the raw token is never stored)",
+    )
+    expires_at: datetime = Field(..., index=True, description="When this token expires")
     revoked: bool = Field(default=False, description="If True, token is invalidated")
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
 
@@ -23,6 +26,26 @@ class RefreshToken(SQLModel, table=True):
     user: "User" = Relationship(back_populates="refresh_tokens")
 
 
+class RevokedToken(SQLModel, table=True):
+    """Access tokens revoked before they expire (logout). Rows are purged after expires_at."""
+    jti: str = Field(primary_key=True, max_length=32, description="Token id claim of the revoked access token")
+    user_id: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=True)
+    )
+    expires_at: datetime = Field(..., index=True, description="When the revoked token would have expired")
+    revoked_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None), index=True
+    )
+
+
+class RateLimitBucket(SQLModel, table=True):
+    """Token buckets shared by all workers (only used when RATE_LIMIT_SHARED is on)."""
+    key: str = Field(primary_key=True, max_length=255, description="<limiter>:<username or IP>")
+    tokens: float
+    updated_at: float = Field(..., index=True, description="Unix time of the last attempt")
+    allowed: bool = Field(default=True, description="Whether the last attempt was admitted")
+
+
 class Token(BaseModel):
     access_token: str
     refresh_token: str     
@@ -34,12 +57,25 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = None
     role: Optional[str] = None   # <-- Add role here
+
+
+# Lightweight authenticated identity (what authorization checks need),
+# cached in-process so most requests skip the User + Role lookup.
+class PrincipalRole(BaseModel):
+    id: int
+    name: str
+
+
+class Principal(BaseModel):
+    id: int
+    username: str
+    role: PrincipalRole
    
 
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    username: str
+    username: str = Field(index=True)
     email: str = Field(unique=True, index=True, nullable=False) 
     password_hash: str
     role_id: int = Field(foreign_key="role.id")
@@ -0,0 +1,132 @@
+"""
+Per-request SQL statement counting and N+1 detection (QUERY_AUDIT mode).
+
+With QUERY_AUDIT on, every response carries
+    X-Query-Count      statements executed while serving it
+    X-Query-Time-Ms    time spent in them
+    X-Query-Repeated   statements run QUERY_AUDIT_REPEAT_THRESHOLD+ times (likely N+1)
+and suspicious requests are logged with the repeated SQL.
+
+`count_queries()` / `assert_max_queries()` work without the middleware, e.g.
+to pin the query budget of an endpoint:
+
+    with assert_max_queries(6, "save-answer"):
+        await client.post(f"/quiz_answer/{attempt_id}/save-answer", json=answer)
+"""
+import contextvars
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# Audits open in this context (nested ones all count the same statements)
+_active: contextvars.ContextVar[tuple["QueryAudit", ...]] = contextvars.ContextVar("query_audits", default=())
+
+
+class QueryAudit:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.seconds += elapsed
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int | None = None) -> list[tuple[str, int]]:
+        """Identical statements (parameters aside) executed `threshold` times or more."""
+        threshold = threshold or settings.QUERY_AUDIT_REPEAT_THRESHOLD
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def report(self, limit: int = 3) -> str:
+        lines = [f"{self.count} statements in {self.seconds * 1000:.1f} ms"]
+        for sql, n in self.repeated()[:limit]:
+            lines.append(f"  x{n}: {' '.join(sql.split())[:200]}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryAudit]:
+    audit = QueryAudit()
+    token = _active.set((*_active.get(), audit))
+    try:
+        yield audit
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "") -> Iterator[QueryAudit]:
+    """Fail (AssertionError) when the block runs more than `limit` statements."""
+    with count_queries() as audit:
+        yield audit
+    if audit.count > limit:
+        raise AssertionError(f"{label or 'block'}: expected at most {limit} queries, got {audit.report()}")
+
+
+def audit_engine(engine: AsyncEngine):
+    """Feed every statement of `engine` to the audits open in the calling context."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _active.get():
+            conn.info.setdefault("audit_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        audits = _active.get()
+        started = conn.info.get("audit_started")
+        if not audits or not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        for audit in audits:
+            audit.record(statement, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("audit_started"):
+            conn.info["audit_started"].pop()
+
+
+class QueryAuditMiddleware:
+    """Development/diagnostic middleware: query count headers and N+1 warnings."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as audit:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers += [
+                        (b"x-query-count", str(audit.count).encode()),
+                        (b"x-query-time-ms", f"{audit.seconds * 1000:.1f}".encode()),
+                        (b"x-query-repeated", str(len(audit.repeated())).encode()),
+                    ]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
+
+        route = f"{scope['method']} {route_template(scope)}"
+        if audit.repeated():
+            logger.warning("Possible N+1 on %s: %s", route, audit.report())
+        elif audit.count >= settings.QUERY_AUDIT_WARN_COUNT:
+            logger.warning("Many queries on %s: %s", route, audit.report())
+        else:
+            logger.debug("%s: %s", route, audit.report())
@@ -0,0 +1,56 @@
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.auth.admin import admin_required
+from app.db import get_session
+from app.jobs.queue import get_job, list_jobs, serialize_job
+from app.jobs.storage import load_job_file
+from app.models.user import User
+
+job_router = APIRouter(prefix="/job", tags=["Jobs"])
+
+
+@job_router.get("/")
+async def list_all_jobs(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[User, Depends(admin_required)],
+    status: Optional[str] = None,
+    limit: int = 50,
+):
+    return [serialize_job(job) for job in await list_jobs(session, status, limit)]
+
+
+@job_router.get("/{job_id}")
+async def job_status(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    job_id: int,
+    admin: Annotated[User, Depends(admin_required)],
+):
+    return serialize_job(await get_job(session, job_id))
+
+
+@job_router.get("/{job_id}/result")
+async def job_result(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    job_id: int,
+    admin: Annotated[User, Depends(admin_required)],
+):
+    """JSON result of a finished job, or the produced file for export jobs."""
+    job = await get_job(session, job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} ({job.progress}%)")
+
+    result = job.result or {}
+    if "media_type" in result:
+        output = await load_job_file(job.id, "result")
+        if output is None:
+            raise HTTPException(status_code=410, detail="Job output file is no longer available")
+        return Response(
+            output.data,
+            media_type=output.media_type,
+            headers={"Content-Disposition": f"attachment; filename={output.filename}"},
+        )
+    return result
@@ -0,0 +1,17 @@
+import hmac
+from typing import Annotated, Optional
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from app.config import settings
+from app.metrics import CONTENT_TYPE, render_metrics
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: Annotated[Optional[str], Header()] = None):
+    """Prometheus scrape endpoint; scrapers send `Authorization: Bearer <METRICS_TOKEN>`."""
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not settings.METRICS_TOKEN or not hmac.compare_digest((authorization or "").encode(), expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
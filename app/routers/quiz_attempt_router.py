@@ -1,8 +1,10 @@
 # app/routers/quiz_attempt_router.py
+import logging
 from typing import Annotated, List
 from fastapi import APIRouter, Depends
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from app.admission import admitted, attempt_start_gate
 from app.auth.admin import admin_required, user_required
 from app.db import get_session
 from app.crud.quiz_attempt_crud import create_quiz_attempt, get_all_attempts, delete_attempt, get_or_create_quiz_attempt, get_quiz_attempt, get_user_attempts, submit_quiz_attempt
@@ -11,6 +13,7 @@ from app.models.user import User
 from app.schemas.quiz_schema import QuizAnswerBase, QuizAttemptCreate, QuizAttemptRead, StudentStats
 
 quiz_attempt_router = APIRouter(prefix="/quiz_attempt", tags=["QuizAttempt"])
+logger = logging.getLogger(__name__)
 
 
 @quiz_attempt_router.get("/all_attempts",response_model=QuizAttemptRead)
@@ -25,7 +28,7 @@ async def start_attempt(
     session: Annotated[AsyncSession, Depends(get_session)],
     user: User = Depends(user_required)
 ):
-    print("Received attempt_data:", attempt_data)
+    logger.debug("Start attempt", extra={"quiz_id": attempt_data.quiz_id, "user_id": user.id, "sampled": True})
     return await create_quiz_attempt(session, attempt_data, user)
 
 @quiz_attempt_router.get("/{attempt_id}", response_model=QuizAttemptRead)
@@ -38,8 +41,12 @@ async def fetch_or_create_attempt(session: Annotated[AsyncSession, Depends(get_s
     """
     Retrieve the user's unfinished attempt for the given quiz.
     If no unfinished attempt exists, a new one is created automatically.
+    Admission-controlled: under an exam-start burst callers queue, or get 503 + Retry-After.
     """
-    result = await get_or_create_quiz_attempt(session=session,quiz_id=quiz_id,current_user=current_user)
+    # A principal-cache miss leaves the session holding a pooled connection: return it before queueing
+    await session.close()
+    async with admitted(attempt_start_gate):
+        result = await get_or_create_quiz_attempt(session=session,quiz_id=quiz_id,current_user=current_user)
     return result
 
 @quiz_attempt_router.get("/user/{user_id}/stats", response_model=StudentStats)
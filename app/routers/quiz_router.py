@@ -1,11 +1,14 @@
 from typing import Annotated, List
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.auth.admin import admin_required, user_required
 from app.db import get_session
 from app.crud.quiz_crud import (
-    export_quiz_template, get_all_quizzes, get_quiz_by_id, create_quiz, get_quiz_with_options, get_user_quiz_history, import_quiz, update_quiz, delete_quiz
+    export_quiz_template, get_all_quizzes, get_quiz_by_id, create_quiz, get_quiz_with_options, get_user_quiz_history, import_quiz, import_quizzes, update_quiz, delete_quiz
 )
+from app.crud.quiz_export_crud import export_quizzes, validate_export_request
+from app.jobs.queue import enqueue_job, serialize_job
+from app.jobs.storage import read_job_upload
 from app.models.user import User
 from app.schemas.quiz_schema import QuizAttemptRead, QuizCreate, QuizHistoryRead, QuizRead, QuizUpdate, QuizWithOptions
 
@@ -34,9 +37,84 @@ async def create_import_quiz(
     session: Annotated[AsyncSession, Depends(get_session)],
     admin: Annotated[User, Depends(admin_required)],  # 👈 Explicit
     file: UploadFile = File(...),
+    dry_run: bool = False,
 ):    
-    return await import_quiz(session, admin, file)
+    return await import_quiz(session, admin, file, dry_run)
 
+@quiz_router.post("/import-quizzes")
+async def create_import_quizzes(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[User, Depends(admin_required)],
+    file: UploadFile = File(...),
+):
+    """
+    Batch import: one quiz per sheet of a workbook, or per sheet of every
+    workbook inside a zip. Returns a per-quiz report.
+    """
+    return await import_quizzes(session, admin, file)
+
+@quiz_router.get("/export")
+async def export_many_quizzes(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[User, Depends(admin_required)],
+    quiz_ids: Annotated[list[int], Query()],
+    format: str = "xlsx",
+):
+    """
+    Export several quizzes at once. xlsx (one sheet per quiz) round-trips through
+    /quiz/import-quizzes; csv / json are flat, one row per question, export-only.
+    """
+    return await export_quizzes(session, quiz_ids, format)
+
+@quiz_router.get("/{quiz_id}/export")
+async def export_quiz(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    quiz_id: int,
+    admin: Annotated[User, Depends(admin_required)],
+    format: str = "xlsx",
+):
+    """Export a quiz with its questions and options in the import template layout."""
+    return await export_quizzes(session, [quiz_id], format)
+
+
+
+# ---------------------
+# Background variants: return a job to poll on /job/{job_id}
+# ---------------------
+@quiz_router.post("/import-quiz/job", status_code=202)
+async def queue_import_quiz(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[User, Depends(admin_required)],
+    file: UploadFile = File(...),
+):
+    if not file.filename.endswith((".xlsx", ".xls")):
+        raise HTTPException(status_code=400, detail="Invalid file format. Upload an Excel file.")
+    upload = (file.filename, await read_job_upload(file))
+    job = await enqueue_job(session, "quiz_import", {"filename": file.filename}, admin.id, upload=upload)
+    return serialize_job(job)
+
+@quiz_router.post("/import-quizzes/job", status_code=202)
+async def queue_import_quizzes(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[User, Depends(admin_required)],
+    file: UploadFile = File(...),
+):
+    if not file.filename.endswith((".xlsx", ".xls", ".zip")):
+        raise HTTPException(status_code=400, detail="Invalid file format. Upload an Excel workbook or a zip of workbooks.")
+    upload = (file.filename, await read_job_upload(file))
+    job = await enqueue_job(session, "quiz_import_batch", {"filename": file.filename}, admin.id, upload=upload)
+    return serialize_job(job)
+
+@quiz_router.post("/export/job", status_code=202)
+async def queue_export_quizzes(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: Annotated[User, Depends(admin_required)],
+    quiz_ids: Annotated[list[int], Query()],
+    format: str = "xlsx",
+):
+    quiz_ids = await validate_export_request(session, quiz_ids, format)
+    job = await enqueue_job(session, "quiz_export", {"quiz_ids": quiz_ids, "format": format}, admin.id)
+    return serialize_job(job)
 
 
 @quiz_router.get("/{quiz_id}", response_model=QuizRead)
@@ -1,19 +1,24 @@
 from typing import Annotated
 from sqlmodel.ext.asyncio.session import AsyncSession
-from fastapi import APIRouter, Depends
-from app.auth.admin import admin_required, user_required
+from fastapi import APIRouter, Depends, File, UploadFile
+from app.admission import admission_stats
+from app.auth.admin import admin_required, profile_required, user_required
+from app.auth.rate_limit import signup_rate_limit
+from app.auth.role_registry import role_name
 from app.crud.question_crud import get_all_questions
 from app.crud.quiz_attempt_crud import get_all_attempts
 from app.crud.quiz_crud import get_all_quizzes
+from app.crud.user_import_crud import provision_users
 from app.crud.user_crud import create_user, delete_user, get_all_user, get_user_by_id, signup_student, update_my_profile, update_user
-from app.db import get_session
+from app.db import get_session, pool_stats
+from app.invalidation import invalidation_stats
 from app.models.user import User
 from app.schemas.user_schema  import UserCreate, UserRead, UserUpdate
 
 
 user_router = APIRouter(prefix="/user",tags=["Users"])
 
-@user_router.post("/signup",response_model=UserRead)
+@user_router.post("/signup",response_model=UserRead,dependencies=[Depends(signup_rate_limit)])
 async def register_user(session: Annotated[AsyncSession, Depends(get_session)],user_data:UserCreate):
     user = await signup_student(session=session,user_data=user_data)
     return user
@@ -21,19 +26,19 @@ async def register_user(session: Annotated[AsyncSession, Depends(get_session)],u
 @user_router.get("/me", response_model=UserRead)
 async def get_current_user_profile(
     session: Annotated[AsyncSession, Depends(get_session)],
-    current_user: User = Depends(user_required)
+    current_user: User = Depends(profile_required)
 ):
     return {
         "id": current_user.id,
         "username": current_user.username,
         "email": current_user.email,
-        "role": current_user.role.name,  
+        "role": await role_name(current_user.role_id),
         "created_at": current_user.created_at.isoformat() if current_user.created_at else None,
         "updated_at": current_user.updated_at.isoformat() if current_user.updated_at else None,
     }
 
 @user_router.put("/me/update")
-async def updateMyprofile( data: UserUpdate,session: Annotated[AsyncSession, Depends(get_session)],user: User = Depends(user_required)):
+async def updateMyprofile( data: UserUpdate,session: Annotated[AsyncSession, Depends(get_session)],user: User = Depends(profile_required)):
     user = await update_my_profile(data=data,session=session,user=user)
     return user
 @user_router.get("/admin/stats")
@@ -53,6 +58,24 @@ async def get_admin_stats(session: Annotated[AsyncSession, Depends(get_session)]
     }
 
 
+@user_router.get("/admin/db-pool")
+async def get_db_pool_stats(admin: User = Depends(admin_required)):
+    """Connection pool occupancy and checkout wait times of this worker."""
+    return pool_stats()
+
+
+@user_router.get("/admin/admission")
+async def get_admission_stats(admin: User = Depends(admin_required)):
+    """Admission gates of this worker: slots in use, queue depth, waits and rejections."""
+    return admission_stats()
+
+
+@user_router.get("/admin/invalidation-bus")
+async def get_invalidation_bus_stats(admin: User = Depends(admin_required)):
+    """Cache invalidation events published / received by this worker."""
+    return invalidation_stats()
+
+
 @user_router.get("/",response_model=list[UserRead])
 async def list_users(session: Annotated[AsyncSession, Depends(get_session)],admin: User = Depends(admin_required)):
     user = await get_all_user(session=session,admin=admin)
@@ -63,6 +86,20 @@ async def add_user(session: Annotated[AsyncSession, Depends(get_session)],user_d
     user = await create_user(session=session,user_data=user_data,user=user)
     return user
 
+@user_router.post("/bulk-provision")
+async def bulk_provision_users(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    admin: User = Depends(admin_required),
+    file: UploadFile = File(...),
+    skip_invalid: bool = False,
+):
+    """
+    Create a cohort from a CSV/XLSX roster (columns: Username, Email, Password,
+    optional Role). With skip_invalid, bad rows are reported and the rest created.
+    """
+    return await provision_users(session, file, skip_invalid)
+
+
 
 @user_router.get("/{user_id}",response_model = UserRead)
 async def singal_user(session: Annotated[AsyncSession, Depends(get_session)],user_id: int,user: User = Depends(user_required)):
@@ -0,0 +1,130 @@
+"""
+Auth-path benchmark: statements, transactions and database time per login/refresh.
+
+Runs the /auth/token and /auth/refresh endpoints in-process and counts what
+reaches the database (SQLAlchemy cursor and commit events), next to a replay
+of the old statement sequence (separate commits for revoke, sliding expiry
+and the new token, user and role loaded separately).
+
+    python -m benchmarks.auth_transactions --requests 200
+    DATABASE_URL=postgresql://... python -m benchmarks.auth_transactions
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/auth_bench.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import event, update  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+from sqlmodel import select  # noqa: E402
+from app.auth.deps import create_refresh_token  # noqa: E402
+from app.auth.utils import hash_refresh_token  # noqa: E402
+from app.db import AsyncSessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import RefreshToken, User  # noqa: E402
+
+
+class DbCounter:
+    """Counts statements, commits and time spent inside the driver."""
+
+    def __init__(self):
+        self.reset()
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        event.listen(sync_engine, "commit", self._commit)
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+        self.seconds = 0.0
+        self._started = None
+
+    def _before(self, *args):
+        self._started = time.perf_counter()
+
+    def _after(self, *args):
+        self.statements += 1
+        self.seconds += time.perf_counter() - self._started
+
+    def _commit(self, conn):
+        self.commits += 1
+
+    def report(self, requests: int, elapsed: float) -> dict:
+        return {
+            "statements_per_req": round(self.statements / requests, 2),
+            "commits_per_req": round(self.commits / requests, 2),
+            "db_ms_per_req": round(self.seconds * 1000 / requests, 3),
+            "wall_ms_per_req": round(elapsed * 1000 / requests, 3),
+        }
+
+
+async def _legacy_refresh(username: str, token: str) -> str:
+    """The pre-rewrite refresh sequence, statement for statement."""
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token)))
+        db_token = result.first()
+        db_token.expires_at = datetime.utcnow() + timedelta(hours=2)
+        session.add(db_token)
+        await session.commit()
+
+        result = await session.exec(select(User).where(User.id == db_token.user_id).options(selectinload(User.role)))
+        user = result.first()
+
+        new_token = create_refresh_token(data={"sub": username})
+        await session.execute(update(RefreshToken).where(RefreshToken.id == db_token.id).values(revoked=True))
+        await session.commit()
+        session.add(RefreshToken(
+            user_id=user.id,
+            token_hash=hash_refresh_token(new_token),
+            expires_at=datetime.utcnow() + timedelta(hours=2),
+        ))
+        await session.commit()
+        return new_token
+
+
+async def main(requests: int):
+    engine.sync_engine.echo = False
+    counter = DbCounter()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="https://bench") as client:
+            # Login (bcrypt dominates wall time; compare the DB columns)
+            logins = max(1, requests // 10)
+            counter.reset()
+            started = time.perf_counter()
+            for _ in range(logins):
+                r = await client.post("/auth/token", data={"username": "admin", "password": "admin123"})
+                r.raise_for_status()
+            print(f"login   ({logins} requests):", counter.report(logins, time.perf_counter() - started))
+            token = r.json()["refresh_token"]
+
+            counter.reset()
+            started = time.perf_counter()
+            for _ in range(requests):
+                client.cookies.clear()
+                r = await client.post("/auth/refresh", cookies={"refresh_token": token})
+                r.raise_for_status()
+                token = r.json()["refresh_token"]
+            print(f"refresh ({requests} requests):", counter.report(requests, time.perf_counter() - started))
+
+        counter.reset()
+        started = time.perf_counter()
+        for _ in range(requests):
+            token = await _legacy_refresh("admin", token)
+        print("legacy refresh sequence       :", counter.report(requests, time.perf_counter() - started))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
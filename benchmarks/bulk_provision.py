@@ -0,0 +1,75 @@
+"""
+Bulk-provisioning benchmark: onboard a generated roster through /user/bulk-provision.
+
+Reports end-to-end time for the upload, and the time the same number of
+serialized /user/signup calls would take (measured on a sample).
+
+    python -m benchmarks.bulk_provision --students 5000 --rounds 8
+"""
+import argparse
+import asyncio
+import csv
+import io
+import os
+import tempfile
+import time
+
+
+def _roster(students: int) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Username", "Email", "Password"])
+    for i in range(students):
+        writer.writerow([f"student{i}", f"student{i}@example.com", f"pass-{i:06d}"])
+    return buffer.getvalue().encode()
+
+
+async def main(students: int, sample: int):
+    import httpx
+    from app.db import engine
+    from app.main import app
+
+    engine.sync_engine.echo = False
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="https://bench", timeout=None) as client:
+                r = await client.post("/auth/token", data={"username": "admin", "password": "admin123"})
+                r.raise_for_status()
+                cookies = {"access_token": r.json()["access_token"]}
+
+                started = time.perf_counter()
+                r = await client.post(
+                    "/user/bulk-provision",
+                    files={"file": ("roster.csv", _roster(students), "text/csv")},
+                    cookies=cookies,
+                )
+                elapsed = time.perf_counter() - started
+                r.raise_for_status()
+                print(f"bulk-provision: {r.json()['created']} users in {elapsed:.2f}s")
+
+                started = time.perf_counter()
+                for i in range(sample):
+                    r = await client.post("/user/signup", json={
+                        "username": f"single{i}", "email": f"single{i}@example.com", "password": "secret123",
+                    })
+                    r.raise_for_status()
+                per_call = (time.perf_counter() - started) / sample
+                print(f"/user/signup  : {per_call * 1000:.0f} ms per call -> ~{per_call * students:.0f}s for {students}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--sample", type=int, default=10, help="serialized signups to time")
+    parser.add_argument("--rounds", type=int, default=None, help="PROVISION_PASSWORD_ROUNDS override")
+    args = parser.parse_args()
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/provision_bench.db")
+    # The timed signups all come from one client; keep the throttle out of the measurement
+    for name in ("SIGNUP_IP_BURST", "SIGNUP_IP_PER_MINUTE", "LOGIN_IP_BURST", "LOGIN_IP_PER_MINUTE"):
+        os.environ.setdefault(name, "1000000")
+    if args.rounds:
+        os.environ["PROVISION_PASSWORD_ROUNDS"] = str(args.rounds)
+    asyncio.run(main(args.students, args.sample))
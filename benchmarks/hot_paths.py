@@ -0,0 +1,182 @@
+"""
+Micro-benchmarks of the pure-Python attempt hot paths, on synthetic quizzes.
+
+Times the production functions in isolation (no database, no HTTP) over
+in-memory ORM objects:
+    serialize_attempt       app.auth.utils
+    score_attempt           app.auth.utils (force_submit_attempt grading)
+    grade_submission        app.crud.quiz_attempt_crud (submit_quiz_attempt grading)
+    build_shuffle_data      app.crud.quiz_attempt_crud (get_or_create_quiz_attempt)
+    summarize_quiz_history  app.crud.quiz_crud (get_user_quiz_history aggregation)
+
+--save appends the run to a JSON history; --compare checks it against the last
+saved run and exits non-zero when a case got slower than --threshold.
+
+    python -m benchmarks.hot_paths --sizes 10 100 1000 5000
+    python -m benchmarks.hot_paths --compare --save
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from app.auth.utils import score_attempt, serialize_attempt  # noqa: E402
+from app.crud.quiz_attempt_crud import build_shuffle_data, grade_submission  # noqa: E402
+from app.crud.quiz_crud import summarize_quiz_history  # noqa: E402
+from app.models.quiz import Option, Question, Quiz, QuizAnswer, QuizAttempt, QuizResult  # noqa: E402
+from app.schemas.quiz_schema import QuizAnswerBase  # noqa: E402
+
+DEFAULT_HISTORY = os.path.join(".benchmarks", "hot_paths.json")
+
+
+def make_quiz(questions: int, options: int, rng: random.Random) -> Quiz:
+    quiz = Quiz(id=1, title="Synthetic quiz", total_time=60)
+    option_id = 0
+    rows = []
+    for n in range(1, questions + 1):
+        question = Question(id=n, quiz_id=1, text=f"Question {n}", marks=rng.randint(1, 3))
+        correct = rng.randrange(options)
+        question_options = []
+        for o in range(options):
+            option_id += 1
+            question_options.append(Option(id=option_id, question_id=n, text=f"Option {o}", is_correct=o == correct))
+        question.options = question_options
+        rows.append(question)
+    quiz.questions = rows
+    return quiz
+
+
+def make_attempt(quiz: Quiz, attempt_id: int, answered: float, rng: random.Random) -> QuizAttempt:
+    started = datetime(2026, 1, 1, 9, 0) + timedelta(days=attempt_id)
+    attempt = QuizAttempt(
+        id=attempt_id, quiz_id=quiz.id, user_id=1, attempt_number=attempt_id, started_at=started,
+        submitted_at=started + timedelta(minutes=rng.randint(5, 60)), deadline=started + timedelta(hours=1),
+    )
+    attempt.quiz = quiz
+    attempt.shuffle_data = build_shuffle_data(quiz.questions)
+    attempt.answers = [
+        QuizAnswer(id=attempt_id * 100000 + q.id, attempt_id=attempt_id, question_id=q.id,
+                   selected_option_id=rng.choice(q.options).id)
+        for q in quiz.questions if rng.random() < answered
+    ]
+    attempt.result = QuizResult(id=attempt_id, attempt_id=attempt_id, score=0, max_score=len(quiz.questions))
+    return attempt
+
+
+def cases(size: int, args) -> dict:
+    rng = random.Random(args.seed)
+    quiz = make_quiz(size, args.options, rng)
+    attempt = make_attempt(quiz, 1, args.answered, rng)
+    history = [attempt] + [make_attempt(quiz, n, args.answered, rng) for n in range(2, args.history_attempts + 1)]
+    submitted = [
+        QuizAnswerBase(question_id=q.id, selected_option_id=rng.choice(q.options).id)
+        for q in quiz.questions if rng.random() < args.answered
+    ]
+    return {
+        "serialize_attempt": lambda: serialize_attempt(attempt),
+        "score_attempt": lambda: score_attempt(quiz.questions, attempt.answers),
+        "grade_submission": lambda: grade_submission(attempt.id, quiz.questions, submitted),
+        "build_shuffle_data": lambda: build_shuffle_data(quiz.questions),
+        "summarize_quiz_history": lambda: summarize_quiz_history(history),
+    }
+
+
+def measure(fn, repeat: int) -> float:
+    """Best per-call time over `repeat` rounds (timeit's autorange picks calls per round)."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(args) -> dict:
+    results: dict[str, dict[str, float]] = {}
+    for size in args.sizes:
+        for name, fn in cases(size, args).items():
+            if args.only and name not in args.only:
+                continue
+            results.setdefault(name, {})[str(size)] = measure(fn, args.repeat)
+            print(f"{name:<24} {size:>6} questions  {results[name][str(size)] * 1000:>11.3f} ms", flush=True)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results: dict, previous: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, sizes in results.items():
+        for size, seconds in sizes.items():
+            before = previous.get("results", {}).get(name, {}).get(size)
+            if before is None:
+                continue
+            change = seconds / before - 1
+            marker = "REGRESSION" if change > threshold else ""
+            print(f"{name:<24} {size:>6}  {before * 1000:>10.3f} -> {seconds * 1000:>10.3f} ms  {change:+7.1%} {marker}")
+            if change > threshold:
+                regressions.append(f"{name}[{size}] {change:+.1%}")
+    return regressions
+
+
+def main(args) -> int:
+    results = run(args)
+    history = _load_history(args.history)
+    status = 0
+
+    if args.compare:
+        if history:
+            print(f"\nAgainst {history[-1]['commit'] or 'previous run'} ({history[-1]['timestamp']}):")
+            regressions = compare(results, history[-1], args.threshold)
+            if regressions:
+                print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+                status = 1
+        else:
+            print(f"\nNo previous run in {args.history} to compare against")
+
+    if args.save:
+        history.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("save", "compare", "history")},
+            "results": results,
+        })
+        os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=2)
+        print(f"\nSaved to {args.history}")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000], help="questions per quiz")
+    parser.add_argument("--options", type=int, default=4, help="options per question")
+    parser.add_argument("--answered", type=float, default=0.9, help="share of questions answered")
+    parser.add_argument("--history-attempts", type=int, default=5, help="attempts aggregated by the history case")
+    parser.add_argument("--only", nargs="+", help="run only these cases")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file of saved runs")
+    parser.add_argument("--save", action="store_true", help="append this run to the history")
+    parser.add_argument("--compare", action="store_true", help="compare with the last saved run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown counted as a regression")
+    sys.exit(main(parser.parse_args()))
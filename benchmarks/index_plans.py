@@ -0,0 +1,191 @@
+"""
+Hot-path index benchmark: query plans and latencies without / with the indexes
+added by migration f3c7a2e9b104.
+
+Seeds a synthetic dataset, drops the hot-path indexes, runs each query (plan
++ timings), recreates the indexes, ANALYZEs, and runs them again.
+
+    python -m benchmarks.index_plans --users 5000 --attempts-per-user 10
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.index_plans
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/index_bench.db")
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from app.db import build_engine  # noqa: E402
+from app.models import job, quiz, user  # noqa: E402,F401
+from app.models.quiz import Option, Question, Quiz, QuizAnswer, QuizAttempt, QuizResult  # noqa: E402
+from app.models.user import RefreshToken, Role, User  # noqa: E402
+
+HOT_PATH_INDEXES = [
+    "ix_quizattempt_user_quiz_submitted",
+    "ix_quizattempt_open_deadline",
+    "ix_quizanswer_attempt_id",
+    "ix_question_quiz_id",
+    "ix_option_question_id",
+    "ix_quizresult_graded_at",
+    "ix_refreshtoken_user_id",
+    "ix_user_username",
+]
+BATCH = 5000
+
+
+def _indexes():
+    by_name = {i.name: i for t in SQLModel.metadata.sorted_tables for i in t.indexes}
+    return [by_name[name] for name in HOT_PATH_INDEXES]
+
+
+async def _insert(conn, model, rows):
+    for start in range(0, len(rows), BATCH):
+        await conn.execute(insert(model), rows[start:start + BATCH])
+
+
+async def seed(engine, users: int, quizzes: int, questions: int, attempts_per_user: int, rng: random.Random):
+    now = datetime.utcnow()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await _insert(conn, Role, [{"id": 1, "name": "admin"}, {"id": 2, "name": "student"}])
+        await _insert(conn, User, [
+            {"id": u, "username": f"user{u}", "email": f"user{u}@example.com", "password_hash": "x",
+             "role_id": 2, "created_at": now, "updated_at": now}
+            for u in range(1, users + 1)
+        ])
+        await _insert(conn, Quiz, [
+            {"id": q, "title": f"Quiz {q}", "total_time": 30, "is_active": True, "created_at": now, "updated_at": now}
+            for q in range(1, quizzes + 1)
+        ])
+        await _insert(conn, Question, [
+            {"id": (q - 1) * questions + n, "quiz_id": q, "text": f"Q{n}", "marks": 1}
+            for q in range(1, quizzes + 1) for n in range(1, questions + 1)
+        ])
+        await _insert(conn, Option, [
+            {"question_id": qid, "text": f"O{o}", "is_correct": o == 0}
+            for qid in range(1, quizzes * questions + 1) for o in range(4)
+        ])
+
+        attempts, answers, results, tokens = [], [], [], []
+        attempt_id = 0
+        for u in range(1, users + 1):
+            for n, q in enumerate(rng.sample(range(1, quizzes + 1), min(attempts_per_user, quizzes)), start=1):
+                attempt_id += 1
+                started = now - timedelta(minutes=rng.randint(1, 60 * 24 * 90))
+                submitted = None if rng.random() < 0.05 else started + timedelta(minutes=20)
+                attempts.append({
+                    "id": attempt_id, "quiz_id": q, "user_id": u, "attempt_number": 1, "started_at": started,
+                    "submitted_at": submitted, "deadline": started + timedelta(minutes=30),
+                })
+                answers.extend(
+                    {"attempt_id": attempt_id, "question_id": (q - 1) * questions + k, "selected_option_id": None}
+                    for k in range(1, questions + 1)
+                )
+                if submitted:
+                    results.append({"attempt_id": attempt_id, "score": rng.randint(0, questions),
+                                    "max_score": questions, "graded_at": submitted})
+            tokens.append({"user_id": u, "token_hash": f"{u:064x}", "expires_at": now + timedelta(hours=2),
+                           "revoked": False, "created_at": now})
+        await _insert(conn, QuizAttempt, attempts)
+        await _insert(conn, QuizAnswer, answers)
+        await _insert(conn, QuizResult, results)
+        await _insert(conn, RefreshToken, tokens)
+    return attempt_id
+
+
+def _queries(users: int, quizzes: int, questions: int, attempts: int):
+    return [
+        ("login by username", 'SELECT id, password_hash FROM "user" WHERE username = :username',
+         lambda r: {"username": f"user{r.randint(1, users)}"}),
+        ("open attempt for user+quiz",
+         "SELECT id FROM quizattempt WHERE user_id = :user_id AND quiz_id = :quiz_id AND submitted_at IS NULL",
+         lambda r: {"user_id": r.randint(1, users), "quiz_id": r.randint(1, quizzes)}),
+        ("expired open attempts",
+         "SELECT id FROM quizattempt WHERE submitted_at IS NULL AND deadline < :now",
+         lambda r: {"now": datetime.utcnow() - timedelta(days=60)}),
+        ("answers of attempt", "SELECT id, question_id FROM quizanswer WHERE attempt_id = :attempt_id",
+         lambda r: {"attempt_id": r.randint(1, attempts)}),
+        ("questions of quiz", "SELECT id FROM question WHERE quiz_id = :quiz_id",
+         lambda r: {"quiz_id": r.randint(1, quizzes)}),
+        ("options of question", "SELECT id FROM option WHERE question_id = :question_id",
+         lambda r: {"question_id": r.randint(1, quizzes * questions)}),
+        ("latest results", "SELECT id, score FROM quizresult ORDER BY graded_at DESC LIMIT 50",
+         lambda r: {}),
+        ("refresh tokens of user", "SELECT id FROM refreshtoken WHERE user_id = :user_id AND revoked = false",
+         lambda r: {"user_id": r.randint(1, users)}),
+    ]
+
+
+async def _plan(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "sqlite":
+        rows = (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)).all()
+        return "; ".join(row[-1] for row in rows)
+    rows = (await conn.execute(text(f"EXPLAIN {sql}"), params)).all()
+    return " | ".join(row[0].strip() for row in rows[:3])
+
+
+async def run_queries(engine, queries, repeat: int, rng: random.Random) -> dict:
+    report = {}
+    async with engine.connect() as conn:
+        for name, sql, params in queries:
+            plan = await _plan(conn, sql, params(rng))
+            timings = []
+            for _ in range(repeat):
+                p = params(rng)
+                started = time.perf_counter()
+                (await conn.execute(text(sql), p)).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            report[name] = {
+                "plan": plan,
+                "mean_ms": round(statistics.mean(timings), 3),
+                "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+            }
+    return report
+
+
+async def main(args):
+    engine = build_engine()
+    rng = random.Random(args.seed)
+    print(f"Seeding {engine.url.get_backend_name()}: {args.users} users, {args.quizzes} quizzes ...")
+    started = time.perf_counter()
+    attempts = await seed(engine, args.users, args.quizzes, args.questions, args.attempts_per_user, rng)
+    print(f"  {attempts} attempts, {attempts * args.questions} answers in {time.perf_counter() - started:.1f}s")
+    queries = _queries(args.users, args.quizzes, args.questions, attempts)
+
+    async with engine.begin() as conn:
+        for index in _indexes():
+            await conn.run_sync(index.drop)
+        await conn.execute(text("ANALYZE"))
+    before = await run_queries(engine, queries, args.repeat, random.Random(args.seed))
+
+    async with engine.begin() as conn:
+        for index in _indexes():
+            await conn.run_sync(index.create)
+        await conn.execute(text("ANALYZE"))
+    after = await run_queries(engine, queries, args.repeat, random.Random(args.seed))
+
+    for name, _, _ in queries:
+        b, a = before[name], after[name]
+        print(f"\n{name}")
+        print(f"  before: mean {b['mean_ms']:>9} ms  p95 {b['p95_ms']:>9} ms  plan: {b['plan']}")
+        print(f"  after : mean {a['mean_ms']:>9} ms  p95 {a['p95_ms']:>9} ms  plan: {a['plan']}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--quizzes", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--attempts-per-user", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
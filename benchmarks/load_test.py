@@ -0,0 +1,218 @@
+"""
+Exam load test: N students log in, open the quiz, save answers, then submit.
+
+Drives the real app in-process (httpx ASGITransport, default) or a running
+server over HTTP (--base-url). Students are written straight into the
+database given by DATABASE_URL (one shared password hash), so the server
+must use the same database. Reports throughput and p50/p95/p99 per route.
+
+    python -m benchmarks.load_test --students 200 --concurrency 200 --saves 5 --think 0.5
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.load_test --base-url http://127.0.0.1:8000
+
+Over HTTP, raise the server's login/signup limits (LOGIN_IP_BURST, ...) first:
+every simulated student comes from the same address.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/load_test.db")
+# In-process runs: one client address for everyone, so lift the per-IP limits
+for name in ("LOGIN_IP_BURST", "LOGIN_IP_PER_MINUTE", "LOGIN_USERNAME_BURST"):
+    os.environ.setdefault(name, "1000000")
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import select  # noqa: E402
+from app.auth.utils import get_password_hash  # noqa: E402
+from app.db import AsyncSessionLocal, engine  # noqa: E402
+from app.models.quiz import Option, Question, Quiz  # noqa: E402
+from app.models.user import Role, User  # noqa: E402
+
+PASSWORD = "load-test-pass"
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.rejected: dict[str, int] = defaultdict(int)  # 503 + Retry-After (admission control)
+
+    async def call(self, route: str, request) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - started)
+        if response.status_code == 503 and "retry-after" in response.headers:
+            self.rejected[route] += 1
+            return response
+        if response.status_code >= 400:
+            self.errors[route] += 1
+            return None
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, samples in self.latencies.items():
+            samples.sort()
+            pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 1)  # noqa: E731
+            routes[route] = {
+                "requests": len(samples),
+                "errors": self.errors.get(route, 0),
+                "rejected": self.rejected.get(route, 0),
+                "rps": round(len(samples) / elapsed, 1),
+                "mean_ms": round(statistics.mean(samples) * 1000, 1),
+                "p50_ms": pick(0.50),
+                "p95_ms": pick(0.95),
+                "p99_ms": pick(0.99),
+                "max_ms": round(samples[-1] * 1000, 1),
+            }
+        total = sum(len(s) for s in self.latencies.values())
+        return {"elapsed_s": round(elapsed, 2), "requests": total, "rps": round(total / elapsed, 1), "routes": routes}
+
+
+async def seed(students: int, questions: int, options: int) -> tuple[int, dict[int, list[int]], list[str]]:
+    """One quiz plus `students` accounts; returns (quiz id, question -> option ids, usernames)."""
+    run = f"lt{int(time.time())}"
+    password_hash = get_password_hash(PASSWORD)
+    async with AsyncSessionLocal() as session:
+        student_role = (await session.exec(select(Role.id).where(Role.name == "student"))).one()
+        quiz = Quiz(title=f"Load test {run}", total_time=60, is_active=True)
+        session.add(quiz)
+        await session.flush()
+        question_rows = [Question(quiz_id=quiz.id, text=f"Question {n + 1}", marks=1) for n in range(questions)]
+        session.add_all(question_rows)
+        await session.flush()
+        option_rows = [
+            Option(question_id=q.id, text=f"Option {o + 1}", is_correct=o == 0)
+            for q in question_rows for o in range(options)
+        ]
+        session.add_all(option_rows)
+        usernames = [f"{run}_{n}" for n in range(students)]
+        await session.execute(insert(User), [
+            {"username": u, "email": f"{u}@load.test", "password_hash": password_hash, "role_id": student_role}
+            for u in usernames
+        ])
+        await session.commit()
+
+        answer_key: dict[int, list[int]] = defaultdict(list)
+        for option in option_rows:
+            answer_key[option.question_id].append(option.id)
+        return quiz.id, dict(answer_key), usernames
+
+
+async def student(client_factory, recorder: Recorder, username: str, quiz_id: int,
+                  answer_key: dict[int, list[int]], args, rng: random.Random):
+    async with client_factory() as client:
+        login = await recorder.call("POST /auth/token", client.post(
+            "/auth/token", data={"username": username, "password": PASSWORD}
+        ))
+        if login is None:
+            return
+        # Auth cookies are Secure; send the access token explicitly so plain-HTTP runs work too
+        client.headers["Cookie"] = f"access_token={login.cookies['access_token']}"
+
+        route = "POST /quiz_attempt/{quiz_id}/get-or-create-attempt"
+        for _ in range(args.retries + 1):
+            attempt = await recorder.call(route, client.post(f"/quiz_attempt/{quiz_id}/get-or-create-attempt"))
+            if attempt is None or attempt.status_code != 503:
+                break
+            await asyncio.sleep(float(attempt.headers["retry-after"]))
+        else:
+            recorder.errors[route] += 1  # still turned away after every retry
+            return
+        if attempt is None:
+            return
+        attempt_id = attempt.json()["id"]
+
+        questions = list(answer_key)
+        for question_id in rng.sample(questions, min(args.saves, len(questions))):
+            await asyncio.sleep(rng.uniform(0, 2 * args.think))
+            await recorder.call("POST /quiz_answer/{attempt_id}/save-answer", client.post(
+                f"/quiz_answer/{attempt_id}/save-answer",
+                json={"question_id": question_id, "selected_option_id": rng.choice(answer_key[question_id])},
+            ))
+
+        await asyncio.sleep(rng.uniform(0, 2 * args.think))
+        answers = [{"question_id": q, "selected_option_id": rng.choice(answer_key[q])} for q in questions]
+        await recorder.call("POST /quiz_attempt/submit/{attempt_id}", client.post(
+            f"/quiz_attempt/submit/{attempt_id}", json=answers
+        ))
+
+
+async def run(args, client_factory) -> dict:
+    quiz_id, answer_key, usernames = await seed(args.students, args.questions, args.options)
+    recorder = Recorder()
+    slots = asyncio.Semaphore(args.concurrency)
+    rng = random.Random(args.seed)
+
+    async def limited(username: str, student_rng: random.Random):
+        async with slots:
+            await student(client_factory, recorder, username, quiz_id, answer_key, args, student_rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(u, random.Random(rng.random())) for u in usernames))
+    return recorder.report(time.perf_counter() - started)
+
+
+async def main(args) -> dict:
+    timeout = httpx.Timeout(args.timeout)
+    try:
+        if args.base_url:
+            limits = httpx.Limits(max_connections=1)
+            return await run(args, lambda: httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits))
+
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            return await run(args, lambda: httpx.AsyncClient(transport=transport, base_url="https://load", timeout=timeout))
+    finally:
+        await engine.dispose()
+
+
+def _print(report: dict, args):
+    target = args.base_url or "in-process"
+    print(f"{args.students} students, concurrency {args.concurrency}, {args.questions} questions, "
+          f"{args.saves} saves, think {args.think}s ({target}, {engine.url.get_backend_name()})")
+    print(f"{report['requests']} requests in {report['elapsed_s']}s = {report['rps']} req/s\n")
+    print(f"{'route':<52} {'n':>6} {'err':>5} {'503':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for route, r in report["routes"].items():
+        print(f"{route:<52} {r['requests']:>6} {r['errors']:>5} {r['rejected']:>5} {r['rps']:>7} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=100, help="students active at once")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--saves", type=int, default=5, help="save-answer calls per student before submitting")
+    parser.add_argument("--think", type=float, default=0.2, help="mean pause between a student's requests (s)")
+    parser.add_argument("--retries", type=int, default=5, help="get-or-create retries after 503 (honouring Retry-After)")
+    parser.add_argument("--base-url", help="run against a server instead of in-process")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the report to this file (track results over time)")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    _print(report, args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), **report}, f, indent=2)
+    failed = sum(r["errors"] for r in report["routes"].values())
+    sys.exit(1 if failed else 0)
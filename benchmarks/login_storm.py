@@ -0,0 +1,67 @@
+"""
+Login-storm benchmark: event-loop latency while many bcrypt verifications run.
+
+Simulates N students logging in at once and measures how late a 10 ms ticker
+on the event loop fires, first with bcrypt called inline (the old behaviour),
+then through the bounded hashing pool in app.auth.utils.
+
+    python -m benchmarks.login_storm --logins 300
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from app.auth import utils  # noqa: E402
+
+
+async def _ticker(lags: list[float], stop: asyncio.Event, interval: float = 0.01):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _storm(logins: int, verify) -> dict:
+    hashed = utils.get_password_hash("secret123")
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(verify("secret123", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    lags.sort()
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "logins_per_s": round(logins / elapsed, 1),
+        "loop_lag_p50_ms": round(statistics.median(lags) * 1000, 1) if lags else None,
+        "loop_lag_p99_ms": round(lags[int(len(lags) * 0.99) - 1] * 1000, 1) if lags else None,
+        "loop_lag_max_ms": round(lags[-1] * 1000, 1) if lags else None,
+        "ticks": len(lags),
+    }
+
+
+async def _inline_verify(plain, hashed):
+    return utils.verify_password(plain, hashed)
+
+
+async def main(logins: int):
+    print(f"{logins} concurrent logins, hashing concurrency {utils.settings.PASSWORD_HASH_CONCURRENCY}")
+    print("inline  :", await _storm(logins, _inline_verify))
+    print("off-loop:", await _storm(logins, utils.verify_password_async))
+    print("pool    :", utils.password_hash_stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
@@ -0,0 +1,113 @@
+"""
+Query budgets of the exam-path endpoints: statements per request, N+1 suspects.
+
+Runs login -> get-or-create attempt -> save answer -> submit (and the read
+endpoints around them) in-process, counts the statements of each request with
+app.query_audit, and exits non-zero when an endpoint goes over its budget.
+Budgets are for the default quiz size; lower them when a handler gets cheaper.
+
+    python -m benchmarks.query_budget
+    python -m benchmarks.query_budget --questions 30 --no-fail
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/query_budget.db")
+os.environ.setdefault("JOB_WORKERS", "0")
+
+import httpx  # noqa: E402
+from app.db import AsyncSessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.quiz import Option, Question, Quiz  # noqa: E402
+from app.query_audit import count_queries  # noqa: E402
+
+# endpoint -> max statements (10-question quiz, as measured on SQLite)
+BUDGETS = {
+    "login": 3,
+    "get-or-create attempt": 12,
+    "save answer": 9,
+    "get attempt": 6,
+    "submit": 25,
+    "quiz detail": 3,
+    "my history": 6,
+    "me": 1,
+}
+PASSWORD = "budget-pass-1"
+
+
+async def _seed_quiz(questions: int) -> int:
+    async with AsyncSessionLocal() as session:
+        quiz = Quiz(title="Budget quiz", total_time=30, is_active=True)
+        session.add(quiz)
+        await session.flush()
+        for n in range(questions):
+            question = Question(quiz_id=quiz.id, text=f"Question {n + 1}", marks=1)
+            session.add(question)
+            await session.flush()
+            session.add_all(Option(question_id=question.id, text=f"Option {o}", is_correct=o == 0) for o in range(4))
+        await session.commit()
+        return quiz.id
+
+
+async def _measure(results: dict, name: str, request):
+    with count_queries() as audit:
+        response = await request
+    response.raise_for_status()
+    results[name] = audit
+    return response.json()
+
+
+async def _run(args, results: dict):
+    async with app.router.lifespan_context(app):
+        quiz_id = await _seed_quiz(args.questions)
+        # https: the auth cookies are Secure
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://budget") as client:
+            signup = {"username": "budget", "email": "budget@example.com", "password": PASSWORD}
+            (await client.post("/user/signup", json=signup)).raise_for_status()
+
+            await _measure(results, "login", client.post("/auth/token", data={"username": "budget", "password": PASSWORD}))
+            attempt = await _measure(
+                results, "get-or-create attempt", client.post(f"/quiz_attempt/{quiz_id}/get-or-create-attempt")
+            )
+            attempt_id = attempt["id"]
+            questions = (await client.get(f"/quiz/{quiz_id}/detail")).json()["questions"]
+            first = questions[0]
+            await _measure(results, "save answer", client.post(
+                f"/quiz_answer/{attempt_id}/save-answer",
+                json={"question_id": first["id"], "selected_option_id": first["options"][0]["id"]},
+            ))
+            await _measure(results, "get attempt", client.get(f"/quiz_attempt/{attempt_id}"))
+            answers = [{"question_id": q["id"], "selected_option_id": q["options"][0]["id"]} for q in questions]
+            await _measure(results, "submit", client.post(f"/quiz_attempt/submit/{attempt_id}", json=answers))
+            await _measure(results, "quiz detail", client.get(f"/quiz/{quiz_id}/detail"))
+            await _measure(results, "my history", client.get("/quiz/my-history"))
+            await _measure(results, "me", client.get("/user/me"))
+
+
+async def main(args) -> int:
+    results: dict = {}
+    try:
+        await _run(args, results)
+    finally:
+        await engine.dispose()
+
+    over = 0
+    print(f"{args.questions} questions per quiz\n")
+    for name, audit in results.items():
+        budget = BUDGETS[name]
+        flag = "OVER" if audit.count > budget else "ok"
+        over += audit.count > budget
+        print(f"{name:<24} {audit.count:>4} / {budget:<4} {flag:<4} {audit.seconds * 1000:8.2f} ms")
+        for sql, n in audit.repeated():
+            print(f"    N+1? x{n}: {' '.join(sql.split())[:120]}")
+    return 1 if over and not args.no_fail else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--no-fail", action="store_true", help="report only, always exit 0")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,71 @@
+"""
+Worker startup benchmark: import time and lifespan startup, default vs FAST_BOOT.
+
+Each run is a fresh interpreter (like a new worker) against the same database,
+which is prepared once: schema, seed data and the alembic_version stamp.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_WORKER = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        t2 = time.perf_counter()
+    from app.db import engine
+    await engine.dispose()
+    return t2
+
+t2 = asyncio.run(boot())
+print(json.dumps({"import_s": t1 - t0, "startup_s": t2 - t1, "ready_s": t2 - t0}))
+"""
+
+
+async def _prepare():
+    from sqlalchemy import text
+    from app.cli import seed
+    from app.db import create_db_and_tables, engine, migration_graph
+
+    await create_db_and_tables()
+    await seed()
+    _, heads = migration_graph()
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        await conn.execute(text("DELETE FROM alembic_version"))
+        for head in heads:
+            await conn.execute(text("INSERT INTO alembic_version (version_num) VALUES (:v)"), {"v": head})
+    await engine.dispose()
+
+
+def _boot(env: dict) -> dict:
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", _WORKER], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int):
+    asyncio.run(_prepare())
+    for fast_boot in ("false", "true"):
+        env = {**os.environ, "FAST_BOOT": fast_boot, "JOB_WORKERS": "0"}
+        samples = [_boot(env) for _ in range(runs)]
+        summary = {key: round(statistics.median(s[key] for s in samples) * 1000, 1) for key in samples[0]}
+        print(f"FAST_BOOT={fast_boot:<5} median of {runs} (ms):", summary)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/startup_bench.db")
+    main(args.runs)
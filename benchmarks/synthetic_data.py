@@ -0,0 +1,276 @@
+"""
+Synthetic dataset generator: quizzes, students, attempts, answers and results
+at benchmark scale, deterministic for a given --seed.
+
+Rows are built from the app's models (app/models) and loaded with COPY on
+PostgreSQL (asyncpg copy_records_to_table) or batched executemany inserts on
+other backends. Ids are assigned here, so a rerun with the same arguments
+produces the same data. Timestamps are relative to --epoch, not the clock.
+
+Distributions are given as SPEC strings:
+    20               constant
+    uniform:5:40     uniform integer in [5, 40]
+    normal:20:6      normal (mean, stddev), rounded and clamped to the minimum
+    exp:3            exponential with the given mean, rounded
+
+    python -m benchmarks.synthetic_data --reset --users 1000 --quizzes 50
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.synthetic_data --reset \\
+        --users 100000 --quizzes 2000 --attempts exp:5 --questions normal:20:6
+
+The generated students log in as user<N> with password --password; the admin
+account is admin / admin123 as with `python -m app.cli seed`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/synthetic.db")
+
+from sqlalchemy import JSON, func, insert, select, text  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from app.auth.utils import get_password_hash  # noqa: E402
+from app.db import engine  # noqa: E402
+from app.models import job, quiz, user  # noqa: E402,F401
+from app.models.quiz import Option, Question, Quiz, QuizAnswer, QuizAttempt, QuizResult  # noqa: E402
+from app.models.user import Role, User  # noqa: E402
+
+# Parents before children: buffers are flushed in this order
+TABLES = [Role, User, Quiz, Question, Option, QuizAttempt, QuizAnswer, QuizResult]
+BATCH = 50_000
+
+
+class Distribution:
+    def __init__(self, spec: str, minimum: float = 0):
+        self.spec = spec
+        self.minimum = minimum
+        kind, _, params = spec.partition(":") if ":" in spec else ("const", "", spec)
+        values = [float(v) for v in params.split(":")] if params else []
+        samplers = {
+            "const": (1, lambda rng: values[0]),
+            "uniform": (2, lambda rng: rng.uniform(values[0], values[1] + 1)),
+            "normal": (2, lambda rng: rng.gauss(values[0], values[1])),
+            "exp": (1, lambda rng: rng.expovariate(1 / values[0])),
+        }
+        if kind not in samplers or len(values) != samplers[kind][0]:
+            raise argparse.ArgumentTypeError(f"bad distribution {spec!r} (e.g. 20, uniform:5:40, normal:20:6, exp:3)")
+        self._sample = samplers[kind][1]
+        self._round = int if kind == "uniform" else round
+
+    def sample(self, rng: random.Random) -> float:
+        return max(self.minimum, self._sample(rng))
+
+    def integer(self, rng: random.Random) -> int:
+        return max(int(self.minimum), self._round(self._sample(rng)))
+
+    def __repr__(self):
+        return self.spec
+
+
+class Loader:
+    """Buffers rows per table (column order of the model) and writes them in batches."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg"
+        self.buffers: dict = {model: [] for model in TABLES}
+        self.columns = {model: [c.name for c in model.__table__.columns] for model in TABLES}
+        self.counts = {model.__tablename__: 0 for model in TABLES}
+
+    def add(self, model, row: tuple):
+        self.buffers[model].append(row)
+
+    async def maybe_flush(self):
+        if any(len(rows) >= BATCH for rows in self.buffers.values()):
+            await self.flush()
+
+    async def flush(self):
+        for model in TABLES:
+            rows = self.buffers[model]
+            if rows:
+                await self._write(model, rows)
+                self.counts[model.__tablename__] += len(rows)
+                self.buffers[model] = []
+
+    async def _write(self, model, rows: list[tuple]):
+        table = model.__table__
+        columns = self.columns[model]
+        if self.copy:
+            json_at = [i for i, c in enumerate(columns) if isinstance(table.c[c].type, JSON)]
+            if json_at:
+                rows = [tuple(json.dumps(v) if i in json_at and v is not None else v for i, v in enumerate(r))
+                        for r in rows]
+            raw = await self.conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(table.name, records=rows, columns=columns)
+        else:
+            await self.conn.execute(insert(table), [dict(zip(columns, r)) for r in rows])
+
+
+def _zipf_weights(n: int, skew: float) -> list[float]:
+    """Cumulative popularity weights: quiz k is picked proportionally to 1 / k**skew."""
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1 / rank ** skew
+        cumulative.append(total)
+    return cumulative
+
+
+async def generate(loader: Loader, args, rng: random.Random):
+    epoch = args.epoch
+    admin_hash = get_password_hash("admin123")
+    student_hash = get_password_hash(args.password)
+
+    loader.add(Role, (1, "admin", "Administrator role"))
+    loader.add(Role, (2, "student", "Student role"))
+    loader.add(User, (1, "admin", "admin@gmail.com", admin_hash, 1, epoch, epoch))
+    for u in range(2, args.users + 2):
+        joined = epoch - timedelta(days=args.days + rng.random() * 30)
+        loader.add(User, (u, f"user{u - 1}", f"user{u - 1}@synthetic.test", student_hash, 2, joined, joined))
+    await loader.maybe_flush()
+
+    # Quizzes: per question (first option id, option count, correct option index, marks)
+    quizzes = []
+    question_id = option_id = 0
+    for q in range(1, args.quizzes + 1):
+        total_time = args.quiz_time.integer(rng)
+        created = epoch - timedelta(days=args.days + 30)
+        loader.add(Quiz, (q, f"Synthetic quiz {q}", None, total_time, created, created, None, True))
+        questions = []
+        for n in range(args.questions.integer(rng)):
+            question_id += 1
+            marks = args.marks.integer(rng)
+            loader.add(Question, (question_id, q, f"Quiz {q} question {n + 1}", marks))
+            options = args.options.integer(rng)
+            correct = rng.randrange(options)
+            for o in range(options):
+                loader.add(Option, (option_id + o + 1, question_id, f"Option {o + 1}", o == correct))
+            questions.append((question_id, option_id + 1, options, correct, marks))
+            option_id += options
+        quizzes.append((q, total_time, questions))
+        await loader.maybe_flush()
+
+    popularity = _zipf_weights(len(quizzes), args.quiz_skew)
+    attempt_id = answer_id = result_id = 0
+    span = args.days * 86400
+    started_at = time.perf_counter()
+    for u in range(2, args.users + 2):
+        skill = min(1.0, args.skill.sample(rng))
+        taken: dict[int, int] = {}
+        for _ in range(args.attempts.integer(rng)):
+            q, total_time, questions = rng.choices(quizzes, cum_weights=popularity)[0]
+            taken[q] = taken.get(q, 0) + 1
+            attempt_id += 1
+            started = epoch - timedelta(seconds=rng.random() * span)
+            deadline = started + timedelta(minutes=total_time)
+            submitted = None if rng.random() < args.open_rate else started + (deadline - started) * rng.uniform(0.2, 1.0)
+            shuffle_data = None
+            if args.shuffle_data:
+                order = [question[0] for question in questions]
+                rng.shuffle(order)
+                shuffle_data = {"questions": order, "options": {}}
+                for qid, first, count, _, _ in questions:
+                    option_order = list(range(first, first + count))
+                    rng.shuffle(option_order)
+                    shuffle_data["options"][str(qid)] = option_order
+            loader.add(QuizAttempt, (attempt_id, q, u, taken[q], started, submitted, deadline, shuffle_data))
+
+            score = max_score = 0
+            for qid, first, count, correct, marks in questions:
+                max_score += marks
+                if rng.random() >= args.answered:
+                    continue
+                if count == 1 or rng.random() < skill:
+                    choice = correct
+                    score += marks
+                else:
+                    choice = (correct + rng.randrange(1, count)) % count
+                answer_id += 1
+                loader.add(QuizAnswer, (answer_id, attempt_id, qid, first + choice))
+            if submitted is not None:
+                result_id += 1
+                loader.add(QuizResult, (result_id, attempt_id, score, max_score, submitted))
+        await loader.maybe_flush()
+        if args.progress and (u - 1) % args.progress == 0:
+            rate = answer_id / (time.perf_counter() - started_at)
+            print(f"  {u - 1}/{args.users} users, {attempt_id} attempts, {answer_id} answers ({rate:,.0f}/s)", flush=True)
+    await loader.flush()
+
+
+async def _prepare(conn, reset: bool):
+    if reset:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+    await conn.run_sync(SQLModel.metadata.create_all)
+    if not reset:
+        for model in TABLES:
+            if (await conn.execute(select(func.count()).select_from(model.__table__))).scalar():
+                raise SystemExit(f"{model.__tablename__} is not empty: pass --reset to drop and recreate the tables")
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("SET LOCAL synchronous_commit = off"))
+
+
+async def _finish(conn):
+    if conn.dialect.name == "postgresql":
+        # Ids were loaded explicitly: move the serial sequences past them
+        for model in TABLES:
+            name = model.__table__.name
+            await conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('\"{name}\"', 'id'), coalesce(max(id), 0) + 1, false) "
+                f'FROM "{name}"'
+            ))
+    await conn.execute(text("ANALYZE"))
+
+
+async def main(args) -> dict:
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    try:
+        async with engine.begin() as conn:
+            await _prepare(conn, args.reset)
+            loader = Loader(conn)
+            await generate(loader, args, rng)
+            await _finish(conn)
+    finally:
+        await engine.dispose()
+    return {"elapsed_s": round(time.perf_counter() - started, 1), "rows": loader.counts,
+            "method": "COPY" if loader.copy else "executemany"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=1000, help="students")
+    parser.add_argument("--quizzes", type=int, default=50)
+    parser.add_argument("--questions", type=lambda s: Distribution(s, 1), default=Distribution("normal:20:6", 1),
+                        help="questions per quiz")
+    parser.add_argument("--options", type=lambda s: Distribution(s, 2), default=Distribution("uniform:3:5", 2),
+                        help="options per question")
+    parser.add_argument("--marks", type=lambda s: Distribution(s, 1), default=Distribution("1", 1),
+                        help="marks per question")
+    parser.add_argument("--quiz-time", type=lambda s: Distribution(s, 1), default=Distribution("uniform:10:60", 1),
+                        help="quiz duration (minutes)")
+    parser.add_argument("--attempts", type=lambda s: Distribution(s, 0), default=Distribution("exp:5", 0),
+                        help="attempts per student")
+    parser.add_argument("--skill", type=lambda s: Distribution(s, 0), default=Distribution("normal:0.65:0.15", 0),
+                        help="per-student probability of answering correctly")
+    parser.add_argument("--answered", type=float, default=0.95, help="share of questions answered per attempt")
+    parser.add_argument("--open-rate", type=float, default=0.02, help="share of attempts never submitted")
+    parser.add_argument("--quiz-skew", type=float, default=0.8, help="zipf exponent of quiz popularity (0 = uniform)")
+    parser.add_argument("--days", type=int, default=180, help="attempts spread over this many days before --epoch")
+    parser.add_argument("--epoch", type=datetime.fromisoformat, default=datetime(2026, 1, 1))
+    parser.add_argument("--shuffle-data", action="store_true", help="store shuffle_data on attempts (large)")
+    parser.add_argument("--password", default="synthetic-pass", help="password of every generated student")
+    parser.add_argument("--progress", type=int, default=10000, help="print progress every N users (0 = off)")
+    args = parser.parse_args()
+
+    print(f"Generating into {engine.url.render_as_string(hide_password=True)} (seed {args.seed})", flush=True)
+    report = asyncio.run(main(args))
+    rows = report["rows"]
+    print(f"\nLoaded with {report['method']} in {report['elapsed_s']}s:")
+    for table, count in rows.items():
+        print(f"  {table:<12} {count:>12,}")
+    print(f"  {'answers/s':<12} {rows['quizanswer'] / max(report['elapsed_s'], 0.001):>12,.0f}")